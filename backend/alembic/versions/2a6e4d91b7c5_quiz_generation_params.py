@@ -0,0 +1,35 @@
+"""quiz generation params
+
+Revision ID: 2a6e4d91b7c5
+Revises: 7f2d94c0b8e3
+Create Date: 2026-10-18 16:02:44.118203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2a6e4d91b7c5"
+down_revision: Union[str, Sequence[str], None] = "7f2d94c0b8e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "quiz",
+        sa.Column("difficulty", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.add_column("quiz", sa.Column("number_of_questions", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("quiz", "number_of_questions")
+    op.drop_column("quiz", "difficulty")
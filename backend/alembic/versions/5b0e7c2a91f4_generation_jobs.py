@@ -0,0 +1,52 @@
+"""generation jobs
+
+Revision ID: 5b0e7c2a91f4
+Revises: d8169009cd53
+Create Date: 2026-10-18 10:02:17.420981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e7c2a91f4'
+down_revision: Union[str, Sequence[str], None] = 'd8169009cd53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'generationjob',
+        sa.Column('id', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('text_content', sa.Text(), nullable=False),
+        sa.Column('difficulty', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('number_of_questions', sa.Integer(), nullable=False),
+        sa.Column('bypass_cache', sa.Boolean(), nullable=False),
+        sa.Column('from_topic', sa.Boolean(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('quiz_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_generationjob_status'), 'generationjob', ['status'], unique=False)
+    op.create_index(op.f('ix_generationjob_user_id'), 'generationjob', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_generationjob_user_id'), table_name='generationjob')
+    op.drop_index(op.f('ix_generationjob_status'), table_name='generationjob')
+    op.drop_table('generationjob')
@@ -0,0 +1,33 @@
+"""quiz history index
+
+Revision ID: 7f2d94c0b8e3
+Revises: c3a8f1e56d20
+Create Date: 2026-10-18 15:21:09.352871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2d94c0b8e3'
+down_revision: Union[str, Sequence[str], None] = 'c3a8f1e56d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_quiz_user_id_created_at_id',
+        'quiz',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quiz_user_id_created_at_id', table_name='quiz')
@@ -0,0 +1,44 @@
+"""pdf text cache
+
+Revision ID: 9e41d3b6f027
+Revises: 5b0e7c2a91f4
+Create Date: 2026-10-18 11:40:52.693114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e41d3b6f027'
+down_revision: Union[str, Sequence[str], None] = '5b0e7c2a91f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pdftextcache',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('text_content', sa.Text(), nullable=False),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column('page_offsets', sa.JSON(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.create_index(
+        op.f('ix_pdftextcache_last_used_at'), 'pdftextcache', ['last_used_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pdftextcache_last_used_at'), table_name='pdftextcache')
+    op.drop_table('pdftextcache')
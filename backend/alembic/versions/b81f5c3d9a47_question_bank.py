@@ -0,0 +1,46 @@
+"""question bank
+
+Revision ID: b81f5c3d9a47
+Revises: 2a6e4d91b7c5
+Create Date: 2026-10-18 16:48:31.640527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f5c3d9a47"
+down_revision: Union[str, Sequence[str], None] = "2a6e4d91b7c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "bankquestion",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("topic", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("difficulty", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("element", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_bankquestion_difficulty"), "bankquestion", ["difficulty"], unique=False
+    )
+    op.create_index(
+        op.f("ix_bankquestion_created_at"), "bankquestion", ["created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_bankquestion_created_at"), table_name="bankquestion")
+    op.drop_index(op.f("ix_bankquestion_difficulty"), table_name="bankquestion")
+    op.drop_table("bankquestion")
@@ -0,0 +1,42 @@
+"""quiz questions
+
+Revision ID: c3a8f1e56d20
+Revises: 9e41d3b6f027
+Create Date: 2026-10-18 13:05:33.871520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f1e56d20'
+down_revision: Union[str, Sequence[str], None] = '9e41d3b6f027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'question',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('options', sa.JSON(), nullable=False),
+        sa.Column('correct_option', sa.Integer(), nullable=False),
+        sa.Column('point', sa.Integer(), nullable=True),
+        sa.Column('explanation', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_question_quiz_id'), 'question', ['quiz_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_question_quiz_id'), table_name='question')
+    op.drop_table('question')
@@ -0,0 +1,39 @@
+"""generation cache
+
+Revision ID: d8169009cd53
+Revises: 64bd82918608
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8169009cd53'
+down_revision: Union[str, Sequence[str], None] = '64bd82918608'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'generationcache',
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('elements', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(
+        op.f('ix_generationcache_created_at'), 'generationcache', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_generationcache_created_at'), table_name='generationcache')
+    op.drop_table('generationcache')
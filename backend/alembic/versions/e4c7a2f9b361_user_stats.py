@@ -0,0 +1,116 @@
+"""user stats
+
+Revision ID: e4c7a2f9b361
+Revises: b81f5c3d9a47
+Create Date: 2026-10-18 18:12:05.402871
+
+"""
+
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4c7a2f9b361"
+down_revision: Union[str, Sequence[str], None] = "b81f5c3d9a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def backfill(userstat: sa.Table):
+    """Reprend les anciens résultats texte ("7/10") dans les nouvelles colonnes."""
+    conn = op.get_bind()
+    quiz = sa.table(
+        "quiz",
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("difficulty", sa.String),
+        sa.column("result", sa.String),
+        sa.column("score", sa.Integer),
+        sa.column("max_score", sa.Integer),
+    )
+    rows = conn.execute(
+        sa.select(
+            quiz.c.id, quiz.c.user_id, quiz.c.title, quiz.c.difficulty, quiz.c.result
+        ).where(quiz.c.result.is_not(None), quiz.c.user_id.is_not(None))
+    ).all()
+
+    stats = defaultdict(lambda: {"quizzes": 0, "total_score": 0, "total_max_score": 0})
+    for quiz_id, user_id, title, difficulty, result in rows:
+        # Même règle que backend.routes.stats.parse_result ("6/5" est ignoré)
+        match = re.match(r"^\s*(\d+)\s*/\s*(\d+)\s*$", result)
+        if not match:
+            continue
+        score, max_score = int(match.group(1)), int(match.group(2))
+        if max_score < 1 or score > max_score:
+            continue
+        conn.execute(
+            quiz.update()
+            .where(quiz.c.id == quiz_id)
+            .values(score=score, max_score=max_score)
+        )
+        keys = [("total", ""), ("topic", " ".join(title.lower().split())[:255])]
+        if difficulty:
+            keys.append(("difficulty", difficulty.strip().lower()))
+        for key in keys:
+            stat = stats[(user_id, *key)]
+            stat["quizzes"] += 1
+            stat["total_score"] += score
+            stat["total_max_score"] += max_score
+
+    now = datetime.now()
+    if stats:
+        op.bulk_insert(
+            userstat,
+            [
+                {
+                    "user_id": user_id,
+                    "dimension": dimension,
+                    "key": key,
+                    **counters,
+                    "timed_quizzes": 0,
+                    "total_duration_seconds": 0,
+                    "updated_at": now,
+                }
+                for (user_id, dimension, key), counters in stats.items()
+            ],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("quiz", sa.Column("score", sa.Integer(), nullable=True))
+    op.add_column("quiz", sa.Column("max_score", sa.Integer(), nullable=True))
+    op.add_column("quiz", sa.Column("duration_seconds", sa.Integer(), nullable=True))
+    userstat = op.create_table(
+        "userstat",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "dimension", sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False
+        ),
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("quizzes", sa.Integer(), nullable=False),
+        sa.Column("total_score", sa.Integer(), nullable=False),
+        sa.Column("total_max_score", sa.Integer(), nullable=False),
+        sa.Column("timed_quizzes", sa.Integer(), nullable=False),
+        sa.Column("total_duration_seconds", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("user_id", "dimension", "key"),
+    )
+    backfill(userstat)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("userstat")
+    op.drop_column("quiz", "duration_seconds")
+    op.drop_column("quiz", "max_score")
+    op.drop_column("quiz", "score")
@@ -0,0 +1,37 @@
+import os
+import time
+
+from cachetools import TLRUCache
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+
+from backend.auth.jwt import verify_token
+from backend.database.schemas import CurrentUser
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+
+
+def _token_expiry(_token: str, claims: dict, _now: float) -> float:
+    return claims["exp"]
+
+
+# Claims déjà vérifiés, conservés jusqu'à l'expiration du token
+token_cache: TLRUCache = TLRUCache(
+    maxsize=TOKEN_CACHE_SIZE, ttu=_token_expiry, timer=time.time
+)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = verify_token(token, token_type="access")
+        if not claims or not claims.get("user_id"):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache[token] = claims
+    return CurrentUser(id=claims["user_id"], username=claims.get("sub"))
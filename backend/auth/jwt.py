@@ -32,8 +32,8 @@ def create_refresh_token(data: dict):
 def verify_token(token: str, token_type: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type") == token_type:
+        if payload.get("type") != token_type:
             raise JWTError()
         return payload
-    except ExpiredSignatureError or JWTError:
+    except (ExpiredSignatureError, JWTError):
         return None
@@ -1,6 +1,21 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", 4))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
+
+# bcrypt libère le GIL : un pool de threads dédié suffit à sortir le hachage
+# de la boucle d'événements, et sa taille borne le nombre de hachages simultanés.
+hash_executor = ThreadPoolExecutor(
+    max_workers=HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 
 def verify_password(plain_password, hashed_password):
@@ -9,3 +24,22 @@ def verify_password(plain_password, hashed_password):
 
 def get_password_hash(password):
     return pwd_context.hash(password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Vérifie le mot de passe hors boucle.
+
+    Renvoie ``(valide, nouveau_hash)`` ; ``nouveau_hash`` n'est pas None quand
+    le hash stocké utilise un coût différent de ``BCRYPT_ROUNDS``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor, pwd_context.hash, password)
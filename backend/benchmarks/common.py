@@ -0,0 +1,98 @@
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+
+def configure_environment(**overrides: str):
+    """Prépare une base SQLite jetable et le modèle factice avant d'importer l'app."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="quiz-bench-"), "bench.sqlite")
+    defaults = {
+        "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        "SECRET_KEY": "benchmark",
+        "ALGORITHM": "HS256",
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": "0.5",
+        "BACKEND_API": "http://127.0.0.1:9",
+        "FRONTEND_URL": "http://localhost",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    # Les options passées en ligne de commande priment sur l'environnement
+    os.environ.update(overrides)
+
+
+@asynccontextmanager
+async def running_app():
+    from backend.database.db import engine
+    from backend.main import app, lifespan
+
+    try:
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench/api", timeout=None
+            ) as client:
+                yield client
+    finally:
+        await engine.dispose()
+
+
+async def timed(latencies: list[float], request):
+    start = time.perf_counter()
+    response = await request
+    latencies.append(time.perf_counter() - start)
+    return response
+
+
+async def run_scenario(
+    name: str, requests: list, concurrency: int, expected_status: int = 200
+) -> dict:
+    """Exécute les fabriques de requêtes avec ``concurrency`` workers."""
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    pending = iter(requests)
+
+    async def worker():
+        for make_request in pending:
+            response = await timed(latencies, make_request())
+            if response.status_code != expected_status:
+                key = str(response.status_code)
+                errors[key] = errors.get(key, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {**summarize(name, latencies, elapsed), "errors": errors}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(name: str, latencies: list[float], elapsed: float) -> dict:
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+def write_results(results: dict, output: str | None):
+    payload = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(payload)
+    print(payload)
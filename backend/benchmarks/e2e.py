@@ -0,0 +1,254 @@
+"""Parcours complet de l'API avec le modèle factice, scénario par scénario.
+
+python -m backend.benchmarks.e2e --users 20 --concurrency 10 --requests 50 \\
+    --pdf-pages 1,10,50 --output results.json
+
+Queue de latence (p99) : --llm-tail-rate 0.05 --llm-tail-latency 5 [--hedge]
+
+DATABASE_URL peut pointer vers un Postgres local ; sinon une base SQLite
+jetable est utilisée (aiosqlite : uv sync --group dev, ou
+pip install -r requirements-dev.txt).
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import subprocess
+import time
+import uuid
+from datetime import datetime
+
+from backend.benchmarks.common import (
+    configure_environment,
+    run_scenario,
+    running_app,
+    write_results,
+)
+
+PAGE_TEXT = (
+    "La photosynthèse permet aux plantes de convertir la lumière en énergie "
+    "chimique. Les chloroplastes contiennent la chlorophylle qui absorbe la "
+    "lumière bleue et rouge. "
+) * 12
+
+
+def build_pdf(pages: int, nonce: str) -> bytes:
+    import fitz
+
+    with fitz.open() as doc:
+        for i in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(
+                fitz.Rect(40, 40, 555, 800), f"Section {i + 1} ({nonce})\n{PAGE_TEXT}"
+            )
+        return doc.tobytes()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def unlimited_quotas():
+    # Le quota (5 générations) limiterait le nombre de requêtes mesurées
+    from sqlalchemy import update
+
+    from backend.database.db import async_session
+    from backend.database.models import Quota
+
+    async with async_session() as session:
+        await session.execute(
+            update(Quota).values(quota_remaining=10**9, last_reset=datetime.now())
+        )
+        await session.commit()
+
+
+async def run(args):
+    pdf_sizes = [int(size) for size in args.pdf_pages.split(",") if size]
+    users = [f"bench-{uuid.uuid4().hex[:8]}-{i}" for i in range(args.users)]
+    credentials = [{"username": name, "password": "password"} for name in users]
+    results = []
+
+    async with running_app() as client:
+        results.append(
+            await run_scenario(
+                "sign-up",
+                [
+                    lambda c=c: client.post(
+                        "/sign-up", json={**c, "email": f"{c['username']}@bench.local"}
+                    )
+                    for c in credentials
+                ],
+                args.concurrency,
+            )
+        )
+        await unlimited_quotas()
+
+        headers = []
+        for c in credentials:
+            response = await client.post("/token", json=c)
+            headers.append(
+                {"Authorization": f"Bearer {response.json()['access_token']}"}
+            )
+
+        results.append(
+            await run_scenario(
+                "login",
+                [
+                    lambda i=i: client.post("/token", json=credentials[i % args.users])
+                    for i in range(args.requests)
+                ],
+                args.concurrency,
+            )
+        )
+
+        quiz_ids: list[tuple[dict, int]] = []
+
+        async def generate_from_topic(i: int):
+            h = headers[i % args.users]
+            response = await client.post(
+                "/generate-quiz-from-topic",
+                json={
+                    # Sujet unique par requête : on mesure la génération, pas le cache
+                    "topic": f"Photosynthèse {uuid.uuid4().hex}",
+                    "difficulty": "moyen",
+                    "number_of_questions": args.questions,
+                },
+                headers=h,
+            )
+            if response.status_code == 200:
+                quiz_ids.append((h, response.json()["id"]))
+            return response
+
+        results.append(
+            await run_scenario(
+                "generate-quiz-from-topic",
+                [lambda i=i: generate_from_topic(i) for i in range(args.requests)],
+                args.concurrency,
+            )
+        )
+
+        for pages in pdf_sizes:
+            # PDFs construits avant la mesure, un contenu distinct par requête
+            pdfs = [build_pdf(pages, uuid.uuid4().hex) for _ in range(args.requests)]
+            results.append(
+                await run_scenario(
+                    f"generate-quiz-from-pdf[{pages}p]",
+                    [
+                        lambda i=i, pdf=pdf: client.post(
+                            "/generate-quiz-from-pdf",
+                            data={
+                                "difficulty": "moyen",
+                                "number_of_questions": str(args.questions),
+                            },
+                            files={"file": ("bench.pdf", pdf, "application/pdf")},
+                            headers=headers[i % args.users],
+                        )
+                        for i, pdf in enumerate(pdfs)
+                    ],
+                    args.concurrency,
+                )
+            )
+
+        results.append(
+            await run_scenario(
+                "quizzes-history",
+                [
+                    lambda i=i: client.get(
+                        "/quizzes-history", headers=headers[i % args.users]
+                    )
+                    for i in range(args.requests)
+                ],
+                args.concurrency,
+            )
+        )
+
+        results.append(
+            await run_scenario(
+                "update-quiz-result",
+                [
+                    lambda i=i: client.patch(
+                        f"/quizzes-resul/{quiz_ids[i % len(quiz_ids)][1]}",
+                        json={"result": f"{i % args.questions}/{args.questions}"},
+                        headers=quiz_ids[i % len(quiz_ids)][0],
+                    )
+                    for i in range(args.requests if quiz_ids else 0)
+                ],
+                args.concurrency,
+            )
+        )
+
+    return {
+        "benchmark": "e2e",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "params": vars(args),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--requests", type=int, default=50, help="Requêtes par scénario"
+    )
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument(
+        "--pdf-pages", default="1,10,50", help="Tailles de PDF, en pages"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--llm-tail-rate",
+        type=float,
+        default=0.0,
+        help="Part des appels au modèle factice qui tombent dans la queue de latence",
+    )
+    parser.add_argument("--llm-tail-latency", type=float, default=5.0)
+    parser.add_argument(
+        "--llm-error-rate",
+        type=float,
+        default=0.0,
+        help="Part des appels en erreur passagère (retentés)",
+    )
+    parser.add_argument(
+        "--hedge", action="store_true", help="Requêtes de secours après le p95"
+    )
+    parser.add_argument(
+        "--explanation-size",
+        type=int,
+        default=200,
+        help="Taille des explications renvoyées par le modèle factice",
+    )
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    configure_environment(
+        FAKE_LLM_LATENCY=str(args.llm_latency),
+        FAKE_LLM_EXPLANATION_SIZE=str(args.explanation_size),
+        FAKE_LLM_TAIL_RATE=str(args.llm_tail_rate),
+        FAKE_LLM_TAIL_LATENCY=str(args.llm_tail_latency),
+        FAKE_LLM_ERROR_RATE=str(args.llm_error_rate),
+        LLM_HEDGE_ENABLED=str(args.hedge).lower(),
+    )
+    start = time.perf_counter()
+    results = asyncio.run(run(args))
+    results["total_seconds"] = round(time.perf_counter() - start, 2)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
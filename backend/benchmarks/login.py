@@ -0,0 +1,89 @@
+"""Débit et latence des connexions pendant que d'autres endpoints sont sollicités.
+
+python -m backend.benchmarks.login --users 20 --concurrency 10 --duration 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.benchmarks.common import (
+    configure_environment,
+    running_app,
+    summarize,
+    timed,
+    write_results,
+)
+
+
+async def run(args):
+    async with running_app() as client:
+        for i in range(args.users):
+            await client.post(
+                "/sign-up",
+                json={
+                    "username": f"user{i}",
+                    "password": "password",
+                    "email": f"user{i}@bench.local",
+                },
+            )
+        response = await client.post(
+            "/token", json={"username": "user0", "password": "password"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        login_latencies, ping_latencies, history_latencies = [], [], []
+        deadline = time.perf_counter() + args.duration
+
+        async def login_worker(worker: int):
+            i = worker
+            while time.perf_counter() < deadline:
+                username = f"user{i % args.users}"
+                await timed(
+                    login_latencies,
+                    client.post(
+                        "/token", json={"username": username, "password": "password"}
+                    ),
+                )
+                i += args.concurrency
+
+        async def background_worker():
+            while time.perf_counter() < deadline:
+                await timed(ping_latencies, client.get("/ping"))
+                await timed(
+                    history_latencies, client.get("/quizzes-history", headers=headers)
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(login_worker(i) for i in range(args.concurrency)),
+            *(background_worker() for _ in range(args.background)),
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "benchmark": "login",
+        "params": vars(args),
+        "results": [
+            summarize("login", login_latencies, elapsed),
+            summarize("ping", ping_latencies, elapsed),
+            summarize("quizzes-history", history_latencies, elapsed),
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--background", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    configure_environment()
+    write_results(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Coût de sérialisation des réponses : response_model pydantic contre orjson direct.
+
+python -m backend.benchmarks.serialization --questions 50 --history 1000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from backend.benchmarks.common import percentile, write_results
+from backend.database.schemas import QuizResponse
+
+
+def build_quiz(questions: int) -> dict:
+    return {
+        "id": 1,
+        "title": "Photosynthèse",
+        "created_at": datetime.now(),
+        "quota_remaining": 4,
+        "elements": [
+            {
+                "question": f"Question {i + 1} sur la photosynthèse ?",
+                "options": [f"Option {j + 1}" for j in range(4)],
+                "correct_option": i % 4,
+                "point": 1 + i % 3,
+                "explanation": "La chlorophylle absorbe la lumière. " * 6,
+            }
+            for i in range(questions)
+        ],
+    }
+
+
+def build_history(items: int) -> list[dict]:
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "title": f"Quiz {i}",
+            "result": f"{i % 10}/10",
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(items)
+    ]
+
+
+def pydantic_path(adapter: TypeAdapter):
+    # Chemin de FastAPI avec response_model : validation, encodage, json.dumps
+    def render(payload):
+        validated = adapter.validate_python(payload)
+        return JSONResponse(jsonable_encoder(adapter.dump_python(validated))).body
+
+    return render
+
+
+def orjson_path(payload):
+    return ORJSONResponse(payload).body
+
+
+def measure(render, payload, iterations: int) -> dict:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = render(payload)
+        timings.append(time.perf_counter() - start)
+    return {
+        "bytes": len(body),
+        "p50_us": round(percentile(timings, 50) * 1e6, 1),
+        "p95_us": round(percentile(timings, 95) * 1e6, 1),
+        "p99_us": round(percentile(timings, 99) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--history", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    cases = {
+        f"quiz[{args.questions} questions]": (
+            build_quiz(args.questions),
+            TypeAdapter(QuizResponse),
+        ),
+        f"history[{args.history} items]": (
+            build_history(args.history),
+            TypeAdapter(list[QuizResponse]),
+        ),
+    }
+    results = []
+    for name, (payload, adapter) in cases.items():
+        results.append(
+            {
+                "name": name,
+                "response_model": measure(
+                    pydantic_path(adapter), payload, args.iterations
+                ),
+                "orjson": measure(orjson_path, payload, args.iterations),
+            }
+        )
+    write_results(
+        {"benchmark": "serialization", "params": vars(args), "results": results},
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from backend.database import models  # noqa: F401 (tables de la metadata)
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic")
+
+
+def script_directory():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    return ScriptDirectory.from_config(config)
+
+
+def _schema_state(connection) -> tuple[str | None, bool]:
+    from alembic.runtime.migration import MigrationContext
+
+    revision = MigrationContext.configure(connection).get_current_revision()
+    return revision, bool(inspect(connection).get_table_names())
+
+
+def _stamp_head(connection):
+    from alembic.runtime.migration import MigrationContext
+
+    MigrationContext.configure(connection).stamp(script_directory(), "head")
+
+
+async def ensure_schema(engine: AsyncEngine) -> str:
+    """Vérifie la révision Alembic ; ``create_all`` sur une base vide seulement.
+
+    Renvoie le mode utilisé : "alembic" (rien à faire), "create_all" (base
+    vide, tamponnée à la tête ensuite) ou "pending" (migrations à appliquer :
+    rien n'est créé, /health/ready répond 503).
+    """
+    head = script_directory().get_current_head()
+    async with engine.connect() as conn:
+        revision, has_tables = await conn.run_sync(_schema_state)
+    if revision == head:
+        return "alembic"
+
+    if revision is None and not has_tables:
+        # Base neuve : le schéma créé correspond à la tête des migrations
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(_stamp_head)
+        return "create_all"
+
+    # Tables créées hors migrations, elles masqueraient l'écart de schéma
+    print(
+        f"⚠️ Schéma en révision {revision}, tête {head} : lancer `alembic upgrade head`."
+    )
+    return "pending"
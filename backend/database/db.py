@@ -1,13 +1,124 @@
 import os
+import time
+from collections import deque
 
 from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.routes.metrics import DB_QUERY_SECONDS
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_async_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Caches de requêtes préparées d'asyncpg (0 pour désactiver, ex: derrière pgbouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(
+    os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 100)
+)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+
+pool_stats = {
+    "checkouts": 0,
+    "checkout_wait_total_ms": 0.0,
+    "checkout_wait_max_ms": 0.0,
+    "queries": 0,
+    "slow_queries": 0,
+}
+slow_queries: deque = deque(maxlen=50)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Pool asyncio standard qui mesure l'attente pour obtenir une connexion."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            pool_stats["checkouts"] += 1
+            pool_stats["checkout_wait_total_ms"] += wait_ms
+            pool_stats["checkout_wait_max_ms"] = max(
+                pool_stats["checkout_wait_max_ms"], wait_ms
+            )
+
+
+url = make_url(DATABASE_URL)
+connect_args = {}
+if url.drivername == "postgresql+asyncpg":
+    url = url.update_query_dict(
+        {"prepared_statement_cache_size": str(DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    )
+    connect_args["statement_cache_size"] = DB_STATEMENT_CACHE_SIZE
+
+engine = create_async_engine(
+    url,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Début indexé par requête : une requête en erreur ne décale pas les suivantes
+    conn.info.setdefault("query_start", {})[context] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop(context)
+    duration_ms = duration * 1000
+    pool_stats["queries"] += 1
+    DB_QUERY_SECONDS.observe(duration)
+    if duration_ms >= DB_SLOW_QUERY_MS:
+        pool_stats["slow_queries"] += 1
+        slow_queries.append(
+            {"statement": statement[:300], "duration_ms": round(duration_ms, 2)}
+        )
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    # Pas d'after_cursor_execute pour une requête en erreur
+    conn = exception_context.connection
+    if conn is not None:
+        conn.info.get("query_start", {}).pop(exception_context.execution_context, None)
+
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    checkouts = pool_stats["checkouts"]
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": checkouts,
+        "checkout_wait_avg_ms": (
+            round(pool_stats["checkout_wait_total_ms"] / checkouts, 3)
+            if checkouts
+            else 0.0
+        ),
+        "checkout_wait_max_ms": round(pool_stats["checkout_wait_max_ms"], 3),
+        "queries": pool_stats["queries"],
+        "slow_queries": pool_stats["slow_queries"],
+        "recent_slow_queries": list(slow_queries),
+    }
+
 
 async_session = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
@@ -1,5 +1,8 @@
 from datetime import datetime
 from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import Column, Index, JSON, Text, text
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -28,17 +31,124 @@ class Quota(SQLModel, table=True):
 
 
 class Quiz(SQLModel, table=True):
+    __table_args__ = (
+        # Pagination par curseur de l'historique (user_id, created_at DESC, id DESC)
+        Index(
+            "ix_quiz_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(index=True)
     result: str | None = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.now)
     user_id: int | None = Field(default=None, foreign_key="user.id")
     user: Optional[User] = Relationship(back_populates="quizzes")
+    # Paramètres des quiz générés depuis un sujet (nuls pour les PDF)
+    difficulty: str | None = Field(default=None)
+    number_of_questions: int | None = Field(default=None)
+    # Résultat structuré (``result`` reste le texte affiché, ex: "7/10")
+    score: int | None = Field(default=None)
+    max_score: int | None = Field(default=None)
+    duration_seconds: int | None = Field(default=None)
+    questions: list["Question"] = Relationship(
+        back_populates="quiz",
+        sa_relationship_kwargs={"order_by": "Question.position"},
+    )
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "title": self.title,
             "result": self.result,
+            "score": self.score,
+            "max_score": self.max_score,
+            "duration_seconds": self.duration_seconds,
             "created_at": self.created_at.isoformat(),
         }
+
+
+class UserStat(SQLModel, table=True):
+    # Agrégats tenus à jour à chaque résultat enregistré, par dimension :
+    # "total" (clé vide), "topic" (titre normalisé) ou "difficulty"
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    dimension: str = Field(primary_key=True, max_length=16)
+    key: str = Field(primary_key=True, max_length=255)
+    quizzes: int = Field(default=0)
+    total_score: int = Field(default=0)
+    total_max_score: int = Field(default=0)
+    # Quiz dont la durée est connue, pour la durée moyenne
+    timed_quizzes: int = Field(default=0)
+    total_duration_seconds: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class Question(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    quiz_id: int = Field(foreign_key="quiz.id", index=True)
+    quiz: Optional[Quiz] = Relationship(back_populates="questions")
+    position: int
+    question: str = Field(sa_column=Column(Text, nullable=False))
+    options: list = Field(sa_column=Column(JSON, nullable=False))
+    correct_option: int
+    point: int | None = Field(default=None)
+    explanation: str = Field(sa_column=Column(Text, nullable=False))
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "question": self.question,
+            "options": self.options,
+            "correct_option": self.correct_option,
+            "point": self.point,
+            "explanation": self.explanation,
+        }
+
+
+class GenerationCache(SQLModel, table=True):
+    key: str = Field(primary_key=True, max_length=64)
+    elements: list = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+class BankQuestion(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    topic: str
+    difficulty: str = Field(index=True)
+    element: dict = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+class GenerationJob(SQLModel, table=True):
+    id: str = Field(
+        default_factory=lambda: uuid4().hex, primary_key=True, max_length=32
+    )
+    user_id: int = Field(foreign_key="user.id", index=True)
+    # pending -> running -> succeeded | failed
+    status: str = Field(default="pending", index=True)
+    title: str
+    text_content: str = Field(sa_column=Column(Text, nullable=False))
+    difficulty: str
+    number_of_questions: int
+    bypass_cache: bool = Field(default=False)
+    # Job soumis par sujet (cache, banque de questions) ou depuis un PDF
+    from_topic: bool = Field(default=False)
+    result: list | None = Field(default=None, sa_column=Column(JSON))
+    error: str | None = Field(default=None)
+    quiz_id: int | None = Field(default=None, foreign_key="quiz.id")
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class PdfTextCache(SQLModel, table=True):
+    sha256: str = Field(primary_key=True, max_length=64)
+    text_content: str = Field(sa_column=Column(Text, nullable=False))
+    page_count: int
+    page_offsets: list = Field(sa_column=Column(JSON, nullable=False))
+    size_bytes: int
+    hits: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.now)
+    last_used_at: datetime = Field(default_factory=datetime.now, index=True)
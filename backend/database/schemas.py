@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class User(BaseModel):
@@ -11,8 +11,8 @@ class User(BaseModel):
 
 class QuizType(BaseModel):
     question: str
-    options: list[str]
-    correct_option: int
+    options: list[str] = Field(min_length=4, max_length=4)
+    correct_option: int = Field(ge=0, le=3)
     point: int | None = None
     explanation: str
 
@@ -21,6 +21,7 @@ class QuizRequest(BaseModel):
     topic: str
     difficulty: str
     number_of_questions: int
+    bypass_cache: bool = False
 
 
 class QuizResponse(BaseModel):
@@ -29,6 +30,37 @@ class QuizResponse(BaseModel):
     result: str | None = None
     created_at: datetime | str
     elements: list[QuizType] | None = None
+    quota_remaining: int | None = None
+
+
+class QuizBatchRequest(BaseModel):
+    items: list[QuizRequest] = Field(min_length=1, max_length=20)
+
+
+class QuizBatchItem(BaseModel):
+    topic: str
+    status: str
+    quiz: QuizResponse | None = None
+    error: str | None = None
+
+
+class QuizBatchResponse(BaseModel):
+    items: list[QuizBatchItem]
+    succeeded: int
+    failed: int
+    quota_remaining: int | None = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    error: str | None = None
+    quiz: QuizResponse | None = None
+
+
+class CurrentUser(BaseModel):
+    id: int
+    username: str | None = None
 
 
 class Token(BaseModel):
@@ -55,9 +87,14 @@ class UserRegister(UserLogin):
 class UserResponse(BaseModel):
     user: User
     quizzes: list[QuizResponse] | None = None
+    quizzes_total: int | None = None
     access_token: str
-    quota: int | None = None
+    quota: dict | None = None
 
 
 class QuizUpdate(BaseModel):
-    result: str
+    # Anciens clients : seul ``result`` ("7/10") est envoyé
+    result: str | None = None
+    score: int | None = Field(default=None, ge=0)
+    max_score: int | None = Field(default=None, ge=1)
+    duration_seconds: int | None = Field(default=None, ge=0)
@@ -1,27 +1,39 @@
+import time
+
+_import_start = time.perf_counter()
+
 import os
 import asyncio
 import httpx
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
 
-from backend.routes import auth, quiz
+from backend.routes import auth, quiz, jobs, internal, health, stats, warm_pool
+from backend.routes.llm_provider import get_provider
+from backend.routes.health import print_startup_report, startup_phase, startup_timings
+from backend.routes.question_bank import load_question_bank
 from backend.database.models import User, Quiz
 from dotenv import load_dotenv
 
+from backend.database.bootstrap import ensure_schema
 from backend.database.db import engine
+from backend.routes.metrics import MetricsMiddleware
+from backend.routes.pdf_extraction import shutdown_pdf_pool
 
 load_dotenv()
 
+# Détail par module : python -X importtime -c "import backend.main"
+startup_timings["imports"] = round((time.perf_counter() - _import_start) * 1000, 1)
 
-async def keep_alive():
+
+async def keep_alive(client: httpx.AsyncClient):
     while True:
         try:
             print("⏳ Sending keep-alive ping...")
-            async with httpx.AsyncClient() as client:
-                await client.get(os.getenv("BACKEND_API") + "/ping")
+            await client.get(os.getenv("BACKEND_API") + "/ping")
             print("✅ Ping sent.")
         except Exception as e:
             print(f"❌ Ping failed: {e}")
@@ -32,16 +44,42 @@ async def keep_alive():
 async def lifespan(app: FastAPI):
 
     print("Starting database...")
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    print("Database started.")
-
-    asyncio.create_task(keep_alive())
+    # Vérification de la révision Alembic ; create_all seulement si besoin
+    with startup_phase("schema"):
+        health.state["schema"] = await ensure_schema(engine)
+    print(f"Database started ({health.state['schema']}).")
+
+    # Schéma en retard : les tables récentes peuvent manquer, rien ne les lit
+    if health.state["schema"] != "pending":
+        with startup_phase("question_bank"):
+            await load_question_bank()
+
+        with startup_phase("workers"):
+            await jobs.start_job_workers()
+            warm_pool.start_warm_pool()
+    # Un seul client HTTP (connexions réutilisées) pour toute la durée de l'app
+    http_client = httpx.AsyncClient(timeout=10)
+    ping_task = asyncio.create_task(keep_alive(http_client))
+
+    health.state["ready"] = True
+    print_startup_report()
+    # Chargement du SDK du modèle hors du chemin critique du démarrage
+    preload_task = asyncio.create_task(asyncio.to_thread(get_provider))
     yield
+    health.state["ready"] = False
     print("Closing app...")
+    # Un thread ne s'annule pas : on attend la fin du chargement
+    await asyncio.gather(preload_task, return_exceptions=True)
+    await jobs.stop_job_workers()
+    await warm_pool.stop_warm_pool()
+    shutdown_pdf_pool()
+    ping_task.cancel()
+    await http_client.aclose()
+    await engine.dispose()
 
 
-app = FastAPI(lifespan=lifespan)
+# Sérialisation orjson par défaut (datetime natif, pas d'encodeur intermédiaire)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Middleware CORS
 app.add_middleware(
@@ -50,11 +88,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination de /quizzes-history lue par le client
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],
 )
+# Latence par route, mesurée au plus près du serveur
+app.add_middleware(MetricsMiddleware)
 
 # Routes principales
 app.include_router(auth.router, prefix="/api")
 app.include_router(quiz.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(internal.router, prefix="/api")
+app.include_router(health.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
 
 
 # Route de ping
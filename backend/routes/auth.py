@@ -1,21 +1,26 @@
+import os
+
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from sqlmodel import select
-from starlette.responses import JSONResponse
 
 from backend.auth.jwt import create_access_token, create_refresh_token, verify_token
 from backend.database.schemas import UserLogin, Token, UserRegister, UserResponse
-from backend.auth.utils import verify_password, get_password_hash
+from backend.auth.utils import get_password_hash_async, verify_password_async
 from backend.database.db import get_async_session
-from backend.database.models import User, Quota
-from backend.routes.helper import reset_quota_if_needed
+from backend.database.models import User, Quota, Quiz
+from backend.routes.helper import quota_snapshot
 
 router = APIRouter()
 
+# Nombre de quiz récents renvoyés à la connexion ; l'historique complet
+# est servi par /quizzes-history.
+LOGIN_RECENT_QUIZZES = int(os.getenv("LOGIN_RECENT_QUIZZES", 10))
+
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import and_, func, select
 
 
 @router.post("/sign-up", response_model=UserResponse)
@@ -30,7 +35,7 @@ async def sign_up(
             detail="Username already registered",
         )
 
-    hashed_password = get_password_hash(data.password)
+    hashed_password = await get_password_hash_async(data.password)
     user = User(
         username=data.username,
         email=data.email,
@@ -50,7 +55,7 @@ async def sign_up(
     access_token = create_access_token(user_data)
     refresh_token = create_refresh_token(user_data)
 
-    res = JSONResponse(
+    res = ORJSONResponse(
         {
             "user": {
                 "username": user.username,
@@ -79,33 +84,85 @@ async def login(
     session: AsyncSession = Depends(get_async_session),
 ):
 
+    # Une seule requête : utilisateur, quota, derniers quiz et nombre total.
+    recent = (
+        select(
+            Quiz.id,
+            Quiz.title,
+            Quiz.result,
+            Quiz.created_at,
+            Quiz.user_id,
+            func.row_number()
+            .over(
+                partition_by=Quiz.user_id,
+                order_by=(Quiz.created_at.desc(), Quiz.id.desc()),
+            )
+            .label("rank"),
+            func.count().over(partition_by=Quiz.user_id).label("total"),
+        )
+        .where(
+            Quiz.user_id
+            == select(User.id).where(User.username == data.username).scalar_subquery()
+        )
+        .subquery()
+    )
     result = await session.execute(
-        select(User)
-        .options(selectinload(User.quizzes))
+        select(
+            User,
+            Quota,
+            recent.c.id,
+            recent.c.title,
+            recent.c.result,
+            recent.c.created_at,
+            recent.c.total,
+        )
+        .outerjoin(Quota, Quota.user_id == User.id)
+        .outerjoin(
+            recent,
+            and_(recent.c.user_id == User.id, recent.c.rank <= LOGIN_RECENT_QUIZZES),
+        )
         .where(User.username == data.username)
+        .order_by(recent.c.rank)
     )
-    user = result.first()[0]
-    if not user or verify_password(data.password, user.hashed_password) is False:
+    rows = result.all()
+    if not rows:
         raise HTTPException(status_code=400, detail="Invalid credentials")
+    user, user_quota = rows[0][0], rows[0][1]
+
+    is_valid, new_hash = await verify_password_async(
+        data.password, user.hashed_password
+    )
+    if not is_valid:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    if new_hash:
+        # Coût bcrypt modifié : on remplace le hash de manière transparente
+        user.hashed_password = new_hash
+        await session.commit()
     user_data = {"sub": user.username, "user_id": user.id}
     access_token = create_access_token(user_data)
     refresh_token = create_refresh_token(user_data)
 
-    user_quota = await session.execute(select(Quota).where(Quota.user_id == user.id))
-
-    user_quota = user_quota.scalar_one_or_none()
-
-    user_quota = await reset_quota_if_needed(session, user_quota)
+    quizzes = [
+        {
+            "id": quiz_id,
+            "title": title,
+            "result": quiz_result,
+            "created_at": created_at.isoformat(),
+        }
+        for _, _, quiz_id, title, quiz_result, created_at, _ in rows
+        if quiz_id is not None
+    ]
 
-    res = JSONResponse(
+    res = ORJSONResponse(
         {
             "user": {
                 "id": user.id,
                 "username": user.username,
                 "email": user.email,
             },
-            "quota": user_quota.to_dict(),
-            "quizzes": [quiz.to_dict() for quiz in user.quizzes],
+            "quota": quota_snapshot(user_quota),
+            "quizzes": quizzes,
+            "quizzes_total": rows[0][6] or 0,
             "access_token": access_token,
         }
     )
@@ -136,7 +193,7 @@ async def refresh_token_func(request: Request):
     access_token = create_access_token(payload)
     refresh_token = create_refresh_token(payload)
 
-    res = JSONResponse(
+    res = ORJSONResponse(
         {
             "access_token": access_token,
         }
@@ -154,12 +211,13 @@ async def refresh_token_func(request: Request):
 
 @router.post("/logout")
 async def logout(request: Request):
-    res = JSONResponse(
+    res = ORJSONResponse(
         {
             "message": "Logged out",
         }
     )
     res.delete_cookie(key="refresh_token")
+    return res
 
 
 @router.get("/stay-online")
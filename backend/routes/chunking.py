@@ -0,0 +1,119 @@
+import math
+import os
+import re
+from difflib import SequenceMatcher
+
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", 6000))
+CHARS_PER_TOKEN = 4
+# Questions demandées en plus pour compenser les doublons retirés au merge
+OVERGENERATION_RATIO = 1.25
+DUPLICATE_THRESHOLD = 0.85
+
+SECTION_BREAK = re.compile(r"\n\s*\n|\n(?=\s*(?:\d+(?:\.\d+)*\.?|[IVX]+\.|#+)\s+\S)")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_oversized(section: str, max_tokens: int) -> list[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces, current = [], ""
+    for sentence in SENTENCE_BREAK.split(section):
+        if len(sentence) > max_chars and current:
+            # Le texte en attente précède les tranches de la phrase trop longue
+            pieces.append(current)
+            current = ""
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_text_into_chunks(
+    text: str, max_tokens: int = CHUNK_TOKEN_BUDGET
+) -> list[str]:
+    """Découpe le texte en morceaux d'au plus ``max_tokens`` tokens estimés.
+
+    Les coupures se font de préférence entre sections (lignes vides, titres
+    numérotés), puis entre phrases quand une section dépasse le budget.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current = [], []
+    current_tokens = 0
+    for section in SECTION_BREAK.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        for piece in (
+            _split_oversized(section, max_tokens)
+            if estimate_tokens(section) > max_tokens
+            else [section]
+        ):
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def allocate_questions(chunks: list[str], n: int) -> list[int]:
+    """Répartit ``n`` questions entre les morceaux au prorata de leur taille."""
+    total = sum(len(chunk) for chunk in chunks)
+    shares = [n * len(chunk) / total for chunk in chunks]
+    counts = [math.floor(share) for share in shares]
+    # Plus grands restes d'abord
+    by_remainder = sorted(
+        range(len(chunks)), key=lambda i: shares[i] - counts[i], reverse=True
+    )
+    for i in by_remainder[: n - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def _normalize_question(question: dict) -> str:
+    return re.sub(r"\W+", " ", str(question.get("question", "")).lower()).strip()
+
+
+def is_near_duplicate(question: dict, seen: list[str]) -> bool:
+    """Compare la question aux textes normalisés de ``seen`` et l'y ajoute sinon."""
+    normalized = _normalize_question(question)
+    if any(
+        SequenceMatcher(None, normalized, other).ratio() >= DUPLICATE_THRESHOLD
+        for other in seen
+    ):
+        return True
+    seen.append(normalized)
+    return False
+
+
+def merge_question_sets(question_sets: list[list[dict]], n: int) -> list[dict]:
+    """Fusionne les questions des morceaux, retire les quasi-doublons et garde ``n``."""
+    # Entrelacement pour conserver la couverture du document lors de la coupe
+    interleaved = []
+    for rank in range(max(map(len, question_sets), default=0)):
+        for questions in question_sets:
+            if rank < len(questions):
+                interleaved.append(questions[rank])
+
+    merged, seen = [], []
+    for question in interleaved:
+        if is_near_duplicate(question, seen):
+            continue
+        merged.append(question)
+        if len(merged) == n:
+            break
+    return merged
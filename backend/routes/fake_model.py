@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import AsyncIterator
+
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", 1.0))
+FAKE_LLM_EXPLANATION_SIZE = int(os.getenv("FAKE_LLM_EXPLANATION_SIZE", 200))
+# Queue de latence et erreurs passagères simulées (mesure du p99)
+FAKE_LLM_TAIL_RATE = float(os.getenv("FAKE_LLM_TAIL_RATE", 0))
+FAKE_LLM_TAIL_LATENCY = float(os.getenv("FAKE_LLM_TAIL_LATENCY", 10.0))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", 0))
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Remplaçant local de ``genai.GenerativeModel`` (tests et benchmarks).
+
+    Répond après ``latency`` secondes par un tableau JSON de questions valides
+    entre balises de code ; leur nombre est lu dans le prompt ("Génère N
+    questions"). Une fraction ``tail_rate`` des appels prend ``tail_latency``
+    secondes et une fraction ``error_rate`` échoue avec ``ConnectionError``.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "fake",
+        latency: float = FAKE_LLM_LATENCY,
+        explanation_size: int = FAKE_LLM_EXPLANATION_SIZE,
+        tail_rate: float = FAKE_LLM_TAIL_RATE,
+        tail_latency: float = FAKE_LLM_TAIL_LATENCY,
+        error_rate: float = FAKE_LLM_ERROR_RATE,
+    ):
+        self.model_name = model_name
+        self.latency = latency
+        self.explanation_size = explanation_size
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def _draw_latency(self) -> float:
+        if random.random() < self.error_rate:
+            raise ConnectionError("Erreur passagère simulée du modèle factice.")
+        if random.random() < self.tail_rate:
+            return self.tail_latency
+        return self.latency
+
+    @staticmethod
+    def _token(prompt: str, i: int) -> str:
+        # Textes distincts d'une question à l'autre pour la déduplication
+        return hashlib.sha1(f"{i}:{prompt}".encode("utf-8")).hexdigest()[:16]
+
+    def _build_text(self, prompt: str) -> str:
+        match = re.search(r"Génère (\d+) questions", prompt)
+        n = int(match.group(1)) if match else 5
+        questions = [
+            {
+                "question": f"Question {i + 1} ({self._token(prompt, i)}) ?",
+                "options": [f"Option {j + 1}" for j in range(4)],
+                "correct_option": i % 4,
+                "point": 1 + i % 3,
+                "explanation": ("x" * self.explanation_size) or "Explication",
+            }
+            for i in range(n)
+        ]
+        return "```json\n" + json.dumps(questions, ensure_ascii=False) + "\n```"
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        time.sleep(self._draw_latency())
+        return FakeResponse(self._build_text(prompt))
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        latency = self._draw_latency()
+        if stream:
+            return self._stream(self._build_text(prompt), latency)
+        await asyncio.sleep(latency)
+        return FakeResponse(self._build_text(prompt))
+
+    async def _stream(self, text: str, latency: float) -> AsyncIterator[FakeResponse]:
+        # La latence est répartie sur les morceaux, comme un vrai flux
+        chunks = [text[i : i + 64] for i in range(0, len(text), 64)]
+        for chunk in chunks:
+            await asyncio.sleep(latency / len(chunks))
+            yield FakeResponse(chunk)
@@ -1,24 +1,40 @@
-import json
+import asyncio
+import math
 import os
-import re
-from typing import Any
-import google.generativeai as genai
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 from dotenv import load_dotenv
-from fastapi import UploadFile, HTTPException
-import fitz  # PyMuPDF
+from pydantic import ValidationError
+
+from backend.database.schemas import QuizType
+from backend.routes.chunking import (
+    OVERGENERATION_RATIO,
+    allocate_questions,
+    is_near_duplicate,
+    merge_question_sets,
+    split_text_into_chunks,
+)
+from backend.routes.json_stream import QuestionStreamParser, extract_question_objects
+from backend.routes.llm_provider import LLM_TIMEOUT, complete, complete_stream
+from backend.routes.metrics import (
+    GENERATION_ERRORS,
+    LLM_DISCARDED_QUESTIONS,
+    LLM_PARSE_SECONDS,
+    LLM_TOPUPS,
+)
 
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-client = genai.GenerativeModel(model_name="gemini-1.5-flash")
+# Appels complémentaires quand la réponse contient trop peu de questions valides
+LLM_TOPUP_ATTEMPTS = int(os.getenv("LLM_TOPUP_ATTEMPTS", 1))
 
-MAX_FILE_SIZE = 15 * 1024 * 1024  # 15 MB
+TIMEOUT_ERROR = f"La génération a dépassé le délai de {LLM_TIMEOUT:g}s."
 
 
-def generate_quiz_from_text_with_ai(
-    text_content: str, difficulty: str, n: int
-) -> dict[str, Any]:
-    system_prompt = f"""
+def build_quiz_prompt(
+    text_content: str, difficulty: str, n: int, avoid: list[str] | None = None
+) -> str:
+    prompt = f"""
 En te basant sur le texte suivant :
 ---
 {text_content}
@@ -39,54 +55,196 @@ Le format de chaque question doit être le suivant (en JSON) :
 - L’explication doit être claire et pédagogique.
 - La sortie doit être un tableau JSON uniquement contenant tous les objets question.
 """.strip()
-    try:
-        response = client.generate_content(system_prompt)
-        raw_text = response.text.strip()
-
-        cleaned_text = re.sub(
-            r"^```json\s*|\s*```$", "", raw_text, flags=re.DOTALL
-        ).strip()
+    if avoid:
+        prompt += "\n- Ne reprends aucune de ces questions déjà posées :\n" + "\n".join(
+            f"  * {question}" for question in avoid
+        )
+    return prompt
 
-        cleaned_text = cleaned_text.replace("\xa0", " ")
 
+def validate_questions(objects: list[dict]) -> list[dict]:
+    """Garde les questions conformes à QuizType (4 options, index correct valide)."""
+    questions = []
+    for obj in objects:
         try:
-            quizzes = json.loads(cleaned_text)
-            return {"quizzes": quizzes}
-        except json.JSONDecodeError as e:
-            return {"error": f"Erreur JSON: {str(e)}", "raw_text": cleaned_text}
+            questions.append(QuizType.model_validate(obj).model_dump())
+        except ValidationError:
+            continue
+    discarded = len(objects) - len(questions)
+    if discarded:
+        LLM_DISCARDED_QUESTIONS.inc(discarded)
+    return questions
+
+
+async def request_questions(
+    text_content: str, difficulty: str, n: int, avoid: list[str] | None = None
+) -> list[dict]:
+    system_prompt = build_quiz_prompt(text_content, difficulty, n, avoid)
+    text = await complete(system_prompt)
+    with LLM_PARSE_SECONDS.time():
+        # Seule validation des questions : les réponses HTTP ne les revalident pas
+        return validate_questions(extract_question_objects(text))[:n]
+
+
+async def generate_quiz_from_text_with_ai(
+    text_content: str, difficulty: str, n: int, avoid: list[str] | None = None
+) -> dict[str, Any]:
+    try:
+        questions = await request_questions(text_content, difficulty, n, avoid)
+    except asyncio.TimeoutError:
+        GENERATION_ERRORS.inc(reason="timeout")
+        return {"error": TIMEOUT_ERROR}
     except Exception as e:
         print(e)
+        GENERATION_ERRORS.inc(reason="llm")
         return {"error": str(e)}
 
+    # Les questions récupérées sont gardées ; on ne redemande que les manquantes
+    for _ in range(LLM_TOPUP_ATTEMPTS):
+        missing = n - len(questions)
+        if missing <= 0:
+            break
+        LLM_TOPUPS.inc()
+        try:
+            extra = await request_questions(
+                text_content,
+                difficulty,
+                missing,
+                avoid=(avoid or []) + [question["question"] for question in questions],
+            )
+        except Exception as e:
+            print(e)
+            break
+        questions = merge_question_sets([questions + extra], n)
+
+    if not questions:
+        GENERATION_ERRORS.inc(reason="parse")
+        return {"error": "Aucune question valide dans la réponse du modèle."}
+    return {"quizzes": questions}
+
+
+async def top_up_questions(
+    text_content: str, difficulty: str, n: int, questions: list[dict]
+) -> list[dict]:
+    """Complète une fusion qui a perdu des questions (quasi-doublons)."""
+    if len(questions) >= n:
+        return questions
+    LLM_TOPUPS.inc()
+    extra = await generate_quiz_from_text_with_ai(
+        text_content,
+        difficulty,
+        n - len(questions),
+        avoid=[question["question"] for question in questions],
+    )
+    if "error" in extra:
+        return questions
+    return merge_question_sets([questions + extra["quizzes"]], n)
+
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
-    if file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail="Le fichier PDF est trop volumineux. La limite est de 5 Mo.",
+async def generate_quiz_from_document(
+    text_content: str, difficulty: str, n: int
+) -> dict[str, Any]:
+    """Map-reduce : une génération par morceau, en parallèle, puis fusion."""
+    chunks = split_text_into_chunks(text_content)
+    if len(chunks) == 1:
+        return await generate_quiz_from_text_with_ai(text_content, difficulty, n)
+
+    counts = allocate_questions(chunks, math.ceil(n * OVERGENERATION_RATIO))
+    results = await asyncio.gather(
+        *(
+            generate_quiz_from_text_with_ai(chunk, difficulty, count)
+            for chunk, count in zip(chunks, counts)
+            if count > 0
         )
+    )
 
-    if file.content_type != "application/pdf":
-        raise HTTPException(
-            status_code=400,
-            detail="Type de fichier invalide. Seuls les PDF sont acceptés.",
+    question_sets = [result["quizzes"] for result in results if "error" not in result]
+    if not question_sets:
+        return results[0]
+    questions = merge_question_sets(question_sets, n)
+    # Les doublons retirés entre morceaux sont redemandés sur le plus long
+    return {
+        "quizzes": await top_up_questions(
+            max(chunks, key=len), difficulty, n, questions
         )
+    }
+
+
+async def _stream_chunk(text_content: str, difficulty: str, n: int):
+    system_prompt = build_quiz_prompt(text_content, difficulty, n)
+    parser = QuestionStreamParser()
+    async for text in complete_stream(system_prompt):
+        for question in parser.feed(text):
+            try:
+                yield QuizType.model_validate(question).model_dump()
+            except ValidationError:
+                continue
 
+
+async def _merge_streams(streams: list[AsyncIterator[dict]]) -> AsyncIterator[dict]:
+    """Questions des flux dans leur ordre d'arrivée.
+
+    Avec plusieurs morceaux, un flux en échec est ignoré si les autres
+    produisent des questions, comme dans le map-reduce non streamé.
+    """
+    # File non bornée : le modèle n'attend pas le client, sa place sur le
+    # sémaphore est rendue dès la fin de la génération
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def pump(stream):
+        try:
+            async for question in stream:
+                await queue.put(question)
+            await queue.put(finished)
+        except Exception as e:
+            await queue.put(e)
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    errors, produced, running = [], False, len(tasks)
     try:
-        pdf_content = await file.read()
-        doc = fitz.open(stream=pdf_content, filetype="pdf")
-        text_content = ""
-        for page in doc:
-            text_content += page.get_text()
-        doc.close()
-
-        if not text_content.strip():
-            raise HTTPException(
-                status_code=400, detail="Le PDF ne contient aucun texte extractible."
-            )
+        while running:
+            item = await queue.get()
+            if item is finished or isinstance(item, Exception):
+                running -= 1
+                if item is not finished:
+                    errors.append(item)
+                continue
+            produced = True
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    if errors and (not produced or len(tasks) == 1):
+        raise errors[0]
 
-        return text_content
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Erreur lors du traitement du PDF: {str(e)}"
-        )
+
+async def stream_quiz_from_text_with_ai(
+    text_content: str, difficulty: str, n: int
+) -> AsyncIterator[dict]:
+    """Produit chaque question validée dès que son objet JSON est complet.
+
+    Un long document est découpé comme pour ``generate_quiz_from_document`` :
+    un flux par morceau, en parallèle, sans doublons et coupé à ``n``.
+    """
+    chunks = split_text_into_chunks(text_content)
+    if len(chunks) == 1:
+        streams = [_stream_chunk(text_content, difficulty, n)]
+    else:
+        counts = allocate_questions(chunks, math.ceil(n * OVERGENERATION_RATIO))
+        streams = [
+            _stream_chunk(chunk, difficulty, count)
+            for chunk, count in zip(chunks, counts)
+            if count > 0
+        ]
+
+    seen, produced = [], 0
+    async with aclosing(_merge_streams(streams)) as questions:
+        async for question in questions:
+            if is_near_duplicate(question, seen):
+                continue
+            yield question
+            produced += 1
+            if produced == n:
+                return
@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from cachetools import TTLCache
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from backend.database.db import async_session
+from backend.database.models import GenerationCache
+from backend.routes.chunking import merge_question_sets
+from backend.routes.generate_quizzes import (
+    generate_quiz_from_document,
+    generate_quiz_from_text_with_ai,
+    top_up_questions,
+)
+from backend.routes.question_bank import add_to_bank, assemble_from_bank
+
+GENERATION_CACHE_SIZE = int(os.getenv("GENERATION_CACHE_SIZE", 512))
+GENERATION_CACHE_TTL = int(os.getenv("GENERATION_CACHE_TTL", 24 * 60 * 60))
+WARM_POOL_TTL = int(os.getenv("WARM_POOL_TTL", 6 * 60 * 60))
+# Intervalle minimal entre deux purges des lignes expirées du tier base
+GENERATION_CACHE_PURGE_INTERVAL = int(
+    os.getenv("GENERATION_CACHE_PURGE_INTERVAL", 60 * 60)
+)
+
+# Tier en mémoire (LRU + TTL), partagé par toutes les requêtes du worker
+memory_cache: TTLCache = TTLCache(
+    maxsize=GENERATION_CACHE_SIZE, ttl=GENERATION_CACHE_TTL
+)
+
+# Générations en cours par clé : les requêtes identiques attendent la même tâche
+inflight: dict[str, asyncio.Task] = {}
+
+cache_stats = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "bypassed": 0,
+    # Appels au modèle évités en rejoignant une génération en cours
+    "coalesced": 0,
+    "purged": 0,
+}
+_last_purge: float | None = None
+
+# Quiz pré-générés par le warm pool, jamais encore servis : (instant, questions)
+pregenerated: dict[str, deque] = {}
+
+warm_pool_stats = {
+    "generated": 0,
+    "served": 0,
+    "expired": 0,
+    "evicted": 0,
+    "skipped_busy": 0,
+    "skipped_budget": 0,
+    "skipped_cached": 0,
+}
+
+
+def topic_text(topic: str) -> str:
+    return f"Sujet: {topic}"
+
+
+def normalize_prompt_input(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).replace("\xa0", " ")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def make_generation_key(text_content: str, difficulty: str, n: int) -> str:
+    raw = "\x00".join(
+        [
+            normalize_prompt_input(text_content),
+            normalize_prompt_input(difficulty),
+            str(n),
+        ]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached_generation(key: str) -> list | None:
+    quizzes = memory_cache.get(key)
+    if quizzes is not None:
+        cache_stats["memory_hits"] += 1
+        return quizzes
+
+    cutoff = datetime.now() - timedelta(seconds=GENERATION_CACHE_TTL)
+    async with async_session() as session:
+        result = await session.execute(
+            select(GenerationCache.elements).where(
+                GenerationCache.key == key, GenerationCache.created_at >= cutoff
+            )
+        )
+        quizzes = result.scalar_one_or_none()
+
+    if quizzes is None:
+        cache_stats["misses"] += 1
+        return None
+
+    cache_stats["db_hits"] += 1
+    memory_cache[key] = quizzes
+    return quizzes
+
+
+async def has_cached_generation(key: str) -> bool:
+    """Clé déjà en cache, sans compter de hit ni de miss."""
+    if key in memory_cache:
+        return True
+    cutoff = datetime.now() - timedelta(seconds=GENERATION_CACHE_TTL)
+    async with async_session() as session:
+        result = await session.execute(
+            select(GenerationCache.key).where(
+                GenerationCache.key == key, GenerationCache.created_at >= cutoff
+            )
+        )
+        return result.first() is not None
+
+
+async def purge_expired_generations(session: AsyncSession) -> None:
+    # Le TTLCache expire seul ; le tier base est purgé au plus une fois par
+    # intervalle, lors d'une écriture
+    global _last_purge
+    if (
+        _last_purge is not None
+        and time.monotonic() - _last_purge < GENERATION_CACHE_PURGE_INTERVAL
+    ):
+        return
+    _last_purge = time.monotonic()
+    cutoff = datetime.now() - timedelta(seconds=GENERATION_CACHE_TTL)
+    result = await session.execute(
+        delete(GenerationCache).where(GenerationCache.created_at < cutoff)
+    )
+    await session.commit()
+    cache_stats["purged"] += result.rowcount
+
+
+async def store_generation(key: str, quizzes: list) -> None:
+    memory_cache[key] = quizzes
+    async with async_session() as session:
+        await purge_expired_generations(session)
+        entry = await session.get(GenerationCache, key)
+        if entry:
+            entry.elements = quizzes
+            entry.created_at = datetime.now()
+        else:
+            session.add(GenerationCache(key=key, elements=quizzes))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Une autre requête a inséré la même clé entre-temps
+            await session.rollback()
+
+
+def take_pregenerated(key: str) -> list | None:
+    entries = pregenerated.get(key)
+    cutoff = time.monotonic() - WARM_POOL_TTL
+    while entries:
+        created_at, quizzes = entries.popleft()
+        if created_at >= cutoff:
+            warm_pool_stats["served"] += 1
+            return quizzes
+        warm_pool_stats["expired"] += 1
+    return None
+
+
+async def generate_from_bank(
+    topic: str, text_content: str, difficulty: str, n: int
+) -> dict[str, Any]:
+    """Quiz tiré de la banque ; le modèle ne génère que les questions manquantes."""
+    banked = assemble_from_bank(topic, difficulty, n)
+    if len(banked) == n:
+        return {"quizzes": banked, "banked": len(banked)}
+
+    new_quizzes = await generate_quiz_from_text_with_ai(
+        text_content,
+        difficulty,
+        n - len(banked),
+        avoid=[question["question"] for question in banked],
+    )
+    if "error" in new_quizzes:
+        return new_quizzes
+    await add_to_bank(topic, difficulty, new_quizzes["quizzes"])
+    quizzes = merge_question_sets([banked + new_quizzes["quizzes"]], n)
+    return {
+        "quizzes": await top_up_questions(text_content, difficulty, n, quizzes),
+        "banked": len(banked),
+    }
+
+
+async def _generate_and_store(
+    key: str, text_content: str, difficulty: str, n: int, topic: str | None = None
+) -> dict[str, Any]:
+    quizzes = take_pregenerated(key)
+    if quizzes is not None:
+        await store_generation(key, quizzes)
+        return {"quizzes": quizzes, "pregenerated": True}
+
+    if topic is not None:
+        new_quizzes = await generate_from_bank(topic, text_content, difficulty, n)
+    else:
+        new_quizzes = await generate_quiz_from_document(text_content, difficulty, n)
+    # Un quiz incomplet est servi tel quel mais jamais mis en cache
+    if "error" not in new_quizzes and len(new_quizzes["quizzes"]) == n:
+        await store_generation(key, new_quizzes["quizzes"])
+    return new_quizzes
+
+
+async def generate_quiz_cached(
+    text_content: str,
+    difficulty: str,
+    n: int,
+    bypass_cache: bool = False,
+    topic: str | None = None,
+) -> dict[str, Any]:
+    key = make_generation_key(text_content, difficulty, n)
+
+    if bypass_cache:
+        cache_stats["bypassed"] += 1
+        return await _generate_and_store(key, text_content, difficulty, n)
+
+    task = inflight.get(key)
+    if task is None:
+        quizzes = await get_cached_generation(key)
+        if quizzes is not None:
+            return {"quizzes": quizzes, "cached": True}
+        # Une génération a pu démarrer pendant la lecture du cache
+        task = inflight.get(key)
+
+    if task is not None:
+        cache_stats["coalesced"] += 1
+    else:
+        # La banque de questions ne sert que les demandes par sujet hors bypass :
+        # elle réutilise des questions déjà servies.
+        task = asyncio.create_task(
+            _generate_and_store(key, text_content, difficulty, n, topic)
+        )
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    # shield : l'annulation d'une requête n'interrompt pas celles qui attendent
+    return await asyncio.shield(task)
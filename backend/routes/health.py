@@ -0,0 +1,63 @@
+import sys
+import time
+from contextlib import contextmanager
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+
+from backend.database.db import engine
+
+router = APIRouter()
+
+# Renseigné par le lifespan : prêt une fois le démarrage terminé
+state = {"ready": False, "schema": None}
+startup_timings: dict[str, float] = {}
+
+# Modules lourds dont le chargement est différé au premier usage
+DEFERRED_MODULES = ("google.generativeai", "fitz")
+
+
+@contextmanager
+def startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def print_startup_report():
+    total = sum(startup_timings.values())
+    print(f"🚀 Startup in {total:.0f} ms")
+    for name, ms in startup_timings.items():
+        print(f"   {name:<16} {ms:>8.1f} ms")
+    loaded = [module for module in DEFERRED_MODULES if module in sys.modules]
+    print(f"   deferred modules loaded: {', '.join(loaded) or 'none'}")
+
+
+@router.get("/health/live")
+async def liveness():
+    # Le processus répond : aucune dépendance vérifiée
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    if not state["ready"]:
+        return ORJSONResponse({"status": "starting"}, status_code=503)
+    if state["schema"] == "pending":
+        # Redémarrer après `alembic upgrade head`
+        return ORJSONResponse({"status": "migrations_pending"}, status_code=503)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return ORJSONResponse(
+            {"status": "unavailable", "detail": str(e)}, status_code=503
+        )
+    return {
+        "status": "ok",
+        "schema": state["schema"],
+        "startup_ms": startup_timings,
+    }
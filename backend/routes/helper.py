@@ -1,15 +1,160 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta
 
+import anyio
+from sqlalchemy import case, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database.models import Quota
+from backend.database.db import async_session
+from backend.database.models import Question, Quiz, Quota
 
 
-async def reset_quota_if_needed(db: AsyncSession, quota: Quota):
+QUOTA_LIMIT = 5
+QUOTA_RESET_INTERVAL = timedelta(hours=5)
+
+
+def quota_snapshot(quota: Quota | None) -> dict:
+    """Quota tel qu'après la réinitialisation paresseuse, sans écrire en base.
+
+    La réinitialisation elle-même est faite par ``debit_quota``.
+    """
+    now = datetime.now()
+    if quota is None or now - quota.last_reset > QUOTA_RESET_INTERVAL:
+        return {"quota_remaining": QUOTA_LIMIT, "last_reset": now.isoformat()}
+    return quota.to_dict()
+
+
+async def debit_quota(db: AsyncSession, user_id: int, amount: int = 1) -> int | None:
+    """Réinitialise si besoin puis débite ``amount`` unités, en une seule requête.
+
+    Renvoie le quota restant, ou None si le quota ne couvre pas ``amount``.
+    Le commit est laissé à l'appelant.
+    """
+    now = datetime.now()
+    expired = Quota.last_reset < now - QUOTA_RESET_INTERVAL
+    available = case((expired, QUOTA_LIMIT), else_=Quota.quota_remaining)
+    result = await db.execute(
+        update(Quota)
+        .where(Quota.user_id == user_id, available >= amount)
+        .values(
+            quota_remaining=available - amount,
+            last_reset=case((expired, now), else_=Quota.last_reset),
+        )
+        .returning(Quota.quota_remaining)
+    )
+    return result.scalar_one_or_none()
+
+
+async def refund_quota(db: AsyncSession, user_id: int, amount: int = 1) -> int | None:
+    refunded = Quota.quota_remaining + amount
+    result = await db.execute(
+        update(Quota)
+        .where(Quota.user_id == user_id, Quota.quota_remaining < QUOTA_LIMIT)
+        .values(
+            quota_remaining=case((refunded > QUOTA_LIMIT, QUOTA_LIMIT), else_=refunded)
+        )
+        .returning(Quota.quota_remaining)
+    )
+    return result.scalar_one_or_none()
+
+
+async def refund_quota_now(user_id: int, amount: int = 1) -> int | None:
+    """Rembourse dans sa propre transaction, même pendant une annulation.
+
+    Appelé depuis des ``finally`` : la session de la requête peut être en
+    échec, et une déconnexion du client annule la tâche en cours.
+    """
+    with anyio.CancelScope(shield=True):
+        async with async_session() as session:
+            remaining = await refund_quota(session, user_id, amount)
+            await session.commit()
+            return remaining
+
+
+async def save_quiz_with_questions(
+    db: AsyncSession,
+    title: str,
+    user_id: int,
+    elements: list[dict],
+    difficulty: str | None = None,
+    number_of_questions: int | None = None,
+) -> Quiz:
+    """Ajoute le quiz et ses questions (un seul INSERT groupé) sans commit."""
+    quiz = Quiz(
+        title=title,
+        user_id=user_id,
+        difficulty=difficulty,
+        number_of_questions=number_of_questions,
+    )
+    db.add(quiz)
+    await db.flush()
+
+    if elements:
+        await db.execute(insert(Question), question_rows(quiz.id, elements))
+    return quiz
+
+
+def question_rows(quiz_id: int, elements: list[dict]) -> list[dict]:
+    return [
+        {
+            "quiz_id": quiz_id,
+            "position": position,
+            "question": element.get("question", ""),
+            "options": element.get("options", []),
+            "correct_option": element.get("correct_option", 0),
+            "point": element.get("point"),
+            "explanation": element.get("explanation", ""),
+        }
+        for position, element in enumerate(elements)
+    ]
+
+
+async def save_quizzes_with_questions(
+    db: AsyncSession, user_id: int, quizzes: list[dict]
+) -> list[tuple[int, datetime]]:
+    """Insère plusieurs quiz puis toutes leurs questions (deux INSERT groupés).
+
+    ``quizzes`` contient title, elements, difficulty et number_of_questions.
+    Renvoie (id, created_at) de chaque quiz, dans l'ordre ; pas de commit.
+    """
     now = datetime.now()
-    if now - quota.last_reset > timedelta(hours=5):
-        quota.quota_remaining = 5
-        quota.last_reset = now
-        await db.commit()
-        await db.refresh(quota)
-    return quota
+    result = await db.execute(
+        insert(Quiz).returning(Quiz.id, Quiz.created_at, sort_by_parameter_order=True),
+        [
+            {
+                "title": quiz["title"],
+                "user_id": user_id,
+                "difficulty": quiz["difficulty"],
+                "number_of_questions": quiz["number_of_questions"],
+                "created_at": now,
+            }
+            for quiz in quizzes
+        ],
+    )
+    saved = [tuple(row) for row in result.all()]
+
+    rows = [
+        row
+        for (quiz_id, _), quiz in zip(saved, quizzes)
+        for row in question_rows(quiz_id, quiz["elements"])
+    ]
+    if rows:
+        await db.execute(insert(Question), rows)
+    return saved
+
+
+def encode_history_cursor(quiz: Quiz) -> str:
+    raw = f"{quiz.created_at.isoformat()}|{quiz.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """Lève ValueError si le curseur est invalide."""
+    created_at, quiz_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(quiz_id)
+
+
+def compute_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
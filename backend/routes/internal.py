@@ -0,0 +1,140 @@
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend.database.db import get_pool_stats
+from backend.routes.generation_cache import (
+    cache_stats,
+    pregenerated,
+    warm_pool_stats,
+)
+from backend.routes.llm_provider import LLM_BACKEND, hedge_delay
+from backend.routes.metrics import COLLECTORS, render_metrics
+from backend.routes.pdf_cache import pdf_cache_hit_rate, pdf_cache_stats
+from backend.routes.question_bank import bank_stats, index
+from backend.routes.warm_pool import pool_size
+
+router = APIRouter()
+
+INTERNAL_STATS_TOKEN = os.getenv("INTERNAL_STATS_TOKEN")
+
+
+def check_internal_token(x_internal_token: str | None = Header(None)):
+    # Désactivé tant qu'aucun token n'est configuré
+    if not INTERNAL_STATS_TOKEN or x_internal_token != INTERNAL_STATS_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get(
+    "/internal/stats",
+    include_in_schema=False,
+    dependencies=[Depends(check_internal_token)],
+)
+async def internal_stats():
+    return {
+        "db_pool": get_pool_stats(),
+        "generation_cache": cache_stats,
+        "pdf_cache": {**pdf_cache_stats, "hit_rate": pdf_cache_hit_rate()},
+        "question_bank": {**bank_stats, "size": len(index)},
+        "warm_pool": {
+            **warm_pool_stats,
+            "topics": len(pregenerated),
+            "size": pool_size(),
+        },
+        "llm": {"provider": LLM_BACKEND, "hedge_delay": hedge_delay()},
+    }
+
+
+def collect_cache_metrics() -> list[str]:
+    hits = {
+        "generation_memory": cache_stats["memory_hits"],
+        "generation_db": cache_stats["db_hits"],
+        "pdf_text": pdf_cache_stats["hits"],
+    }
+    misses = {
+        "generation": cache_stats["misses"],
+        "pdf_text": pdf_cache_stats["misses"],
+    }
+    return [
+        "# HELP cache_hits_total Lectures servies par un cache.",
+        "# TYPE cache_hits_total counter",
+        *(
+            f'cache_hits_total{{cache="{name}"}} {value}'
+            for name, value in hits.items()
+        ),
+        "# HELP generation_coalesced_total Appels au modèle évités (génération en cours).",
+        "# TYPE generation_coalesced_total counter",
+        f"generation_coalesced_total {cache_stats['coalesced']}",
+        "# HELP cache_misses_total Lectures absentes du cache.",
+        "# TYPE cache_misses_total counter",
+        *(
+            f'cache_misses_total{{cache="{name}"}} {value}'
+            for name, value in misses.items()
+        ),
+    ]
+
+
+def collect_pool_metrics() -> list[str]:
+    stats = get_pool_stats()
+    return [
+        "# HELP db_pool_connections Connexions du pool par état.",
+        "# TYPE db_pool_connections gauge",
+        *(
+            f'db_pool_connections{{state="{state}"}} {max(stats[state], 0)}'
+            for state in ("in_use", "idle", "overflow")
+        ),
+    ]
+
+
+def collect_warm_pool_metrics() -> list[str]:
+    return [
+        "# HELP warm_pool_quizzes_total Quiz pré-générés par issue.",
+        "# TYPE warm_pool_quizzes_total counter",
+        *(
+            f'warm_pool_quizzes_total{{outcome="{outcome}"}} {warm_pool_stats[outcome]}'
+            for outcome in ("generated", "served", "expired", "evicted")
+        ),
+        "# HELP warm_pool_size Quiz pré-générés en attente.",
+        "# TYPE warm_pool_size gauge",
+        f"warm_pool_size {pool_size()}",
+    ]
+
+
+def collect_question_bank_metrics() -> list[str]:
+    return [
+        "# HELP question_bank_requests_total Demandes passées par la banque.",
+        "# TYPE question_bank_requests_total counter",
+        *(
+            f'question_bank_requests_total{{outcome="{outcome}"}} {bank_stats[outcome]}'
+            for outcome in ("full_hits", "partial_hits", "misses")
+        ),
+        "# HELP question_bank_questions_served_total Questions servies sans appel au modèle.",
+        "# TYPE question_bank_questions_served_total counter",
+        f"question_bank_questions_served_total {bank_stats['questions_served']}",
+        "# HELP question_bank_size Questions indexées en mémoire.",
+        "# TYPE question_bank_size gauge",
+        f"question_bank_size {len(index)}",
+    ]
+
+
+COLLECTORS.extend(
+    [
+        collect_cache_metrics,
+        collect_pool_metrics,
+        collect_warm_pool_metrics,
+        collect_question_bank_metrics,
+    ]
+)
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(check_internal_token)],
+)
+async def metrics():
+    # Format texte d'exposition Prometheus
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,218 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi.params import Depends
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from backend.auth.dependencies import get_current_user
+from backend.database.db import async_session, get_async_session
+from backend.database.models import GenerationJob, Quiz
+from backend.database.schemas import CurrentUser, JobResponse, QuizRequest
+from backend.routes.generation_cache import generate_quiz_cached, topic_text
+from backend.routes.helper import (
+    debit_quota,
+    refund_quota,
+    save_quiz_with_questions,
+)
+from backend.routes.metrics import QUOTA_REJECTIONS
+from backend.routes.pdf_extraction import extract_text_from_pdf
+
+router = APIRouter()
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+# Un job "running" plus ancien est considéré comme abandonné au démarrage
+JOB_STALE_AFTER = timedelta(seconds=int(os.getenv("JOB_STALE_AFTER", 15 * 60)))
+
+job_queue: asyncio.Queue[str] = asyncio.Queue()
+_workers: list[asyncio.Task] = []
+
+
+async def claim_job(job_id: str) -> GenerationJob | None:
+    # pending -> running en une requête : un seul worker (ou processus) gagne
+    async with async_session() as session:
+        result = await session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.status == "pending")
+            .values(status="running", updated_at=datetime.now())
+            .returning(GenerationJob)
+        )
+        job = result.scalar_one_or_none()
+        await session.commit()
+        return job
+
+
+async def fail_job(session: AsyncSession, job: GenerationJob, error: str):
+    # Le quota réservé à la soumission est rendu, dans la même transaction
+    job.status = "failed"
+    job.error = error
+    job.updated_at = datetime.now()
+    await refund_quota(session, job.user_id)
+    await session.commit()
+
+
+async def run_job(job_id: str):
+    job = await claim_job(job_id)
+    if job is None:
+        return
+
+    # Aucune session n'est gardée ouverte pendant l'appel au modèle
+    new_quizzes = await generate_quiz_cached(
+        job.text_content,
+        job.difficulty,
+        job.number_of_questions,
+        bypass_cache=job.bypass_cache,
+        topic=job.title if job.from_topic else None,
+    )
+
+    async with async_session() as session:
+        job = await session.get(GenerationJob, job_id)
+        if "error" in new_quizzes:
+            await fail_job(session, job, new_quizzes["error"])
+            return
+
+        new_quizzes_list = new_quizzes.get("quizzes", [])
+        new_quizz = await save_quiz_with_questions(
+            session,
+            job.title,
+            job.user_id,
+            new_quizzes_list,
+            difficulty=job.difficulty if job.from_topic else None,
+            number_of_questions=job.number_of_questions if job.from_topic else None,
+        )
+        job.status = "succeeded"
+        job.result = new_quizzes_list
+        job.quiz_id = new_quizz.id
+        job.updated_at = datetime.now()
+        await session.commit()
+
+
+async def job_worker():
+    while True:
+        job_id = await job_queue.get()
+        try:
+            await run_job(job_id)
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            async with async_session() as session:
+                job = await session.get(GenerationJob, job_id)
+                if job and job.status == "running":
+                    await fail_job(session, job, str(e))
+        finally:
+            job_queue.task_done()
+
+
+async def start_job_workers():
+    async with async_session() as session:
+        # Jobs "running" sans nouvelles depuis JOB_STALE_AFTER : processus
+        # interrompu, ils repassent en attente (une seule fois, atomiquement)
+        await session.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.status == "running",
+                GenerationJob.updated_at < datetime.now() - JOB_STALE_AFTER,
+            )
+            .values(status="pending", updated_at=datetime.now())
+        )
+        await session.commit()
+        result = await session.execute(
+            select(GenerationJob.id)
+            .where(GenerationJob.status == "pending")
+            .order_by(GenerationJob.created_at)
+        )
+        # Chaque job est ensuite réclamé par claim_job avant d'être exécuté
+        for job_id in result.scalars().all():
+            job_queue.put_nowait(job_id)
+
+    for _ in range(JOB_WORKERS):
+        _workers.append(asyncio.create_task(job_worker()))
+
+
+async def stop_job_workers():
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def submit_job(session: AsyncSession, job: GenerationJob) -> dict:
+    # Le quota est réservé à la soumission (rendu si le job échoue) : une
+    # file de jobs ne peut pas dépasser le quota restant
+    if await debit_quota(session, job.user_id) is None:
+        QUOTA_REJECTIONS.inc()
+        raise HTTPException(status_code=401, detail="No quota remaining")
+    session.add(job)
+    await session.commit()
+    job_queue.put_nowait(job.id)
+    return {"id": job.id, "status": job.status}
+
+
+@router.post(
+    "/jobs/generate-quiz-from-topic", response_model=JobResponse, status_code=202
+)
+async def submit_quiz_from_topic(
+    data: QuizRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    job = GenerationJob(
+        user_id=current_user.id,
+        title=data.topic,
+        text_content=topic_text(data.topic),
+        difficulty=data.difficulty,
+        number_of_questions=data.number_of_questions,
+        bypass_cache=data.bypass_cache,
+        from_topic=True,
+    )
+    return await submit_job(session, job)
+
+
+@router.post(
+    "/jobs/generate-quiz-from-pdf", response_model=JobResponse, status_code=202
+)
+async def submit_quiz_from_pdf(
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    difficulty: str = Form(...),
+    number_of_questions: int = Form(...),
+    file: UploadFile = File(...),
+    bypass_cache: bool = Form(False),
+):
+    text_content = await extract_text_from_pdf(file)
+
+    job = GenerationJob(
+        user_id=current_user.id,
+        title=file.filename or "Quiz from PDF",
+        text_content=text_content,
+        difficulty=difficulty,
+        number_of_questions=number_of_questions,
+        bypass_cache=bypass_cache,
+        from_topic=False,
+    )
+    return await submit_job(session, job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    job = await session.get(GenerationJob, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    response = {"id": job.id, "status": job.status, "error": job.error}
+    if job.status == "succeeded":
+        quiz = await session.get(Quiz, job.quiz_id)
+        response["quiz"] = {
+            "id": quiz.id,
+            "title": quiz.title,
+            "result": quiz.result,
+            "created_at": quiz.created_at,
+            "elements": job.result,
+        }
+    return response
@@ -0,0 +1,100 @@
+import json
+import re
+
+import orjson
+
+# Virgule finale avant une accolade ou un crochet fermant, erreur fréquente du modèle
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def loads_lenient(raw: str):
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return json.loads(TRAILING_COMMA.sub(r"\1", raw))
+
+
+class QuestionStreamParser:
+    """Extrait les objets JSON de premier niveau d'un tableau reçu par morceaux.
+
+    Les clôtures Markdown, crochets et virgules entre objets sont ignorés ;
+    seuls les objets complets et décodables sont renvoyés par ``feed``.
+    """
+
+    def __init__(self):
+        self._current: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        objects = []
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._current = [char]
+                continue
+
+            self._current.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._current).replace("\xa0", " ")
+                    try:
+                        objects.append(loads_lenient(raw))
+                    except json.JSONDecodeError:
+                        pass
+        return objects
+
+
+def extract_question_objects(raw_text: str) -> list[dict]:
+    """Récupère les objets question d'une réponse complète du modèle.
+
+    Le tableau est décodé d'un bloc quand c'est possible ; sinon (prose autour,
+    clôtures, réponse tronquée, objet invalide) seuls les objets complets et
+    décodables sont conservés.
+    """
+    text = raw_text.replace("\xa0", " ")
+    start, end = text.find("["), text.rfind("]")
+    objects = None
+    if start != -1 and end > start:
+        try:
+            data = loads_lenient(text[start : end + 1])
+            if isinstance(data, list):
+                objects = data
+        except json.JSONDecodeError:
+            pass
+    if objects is None:
+        objects = QuestionStreamParser().feed(text)
+
+    questions = []
+    for obj in objects:
+        if not isinstance(obj, dict):
+            continue
+        if "question" in obj:
+            questions.append(obj)
+            continue
+        # Tableau enveloppé, ex: {"questions": [...]}
+        for value in obj.values():
+            if isinstance(value, list):
+                questions.extend(item for item in value if isinstance(item, dict))
+    return questions
+
+
+def format_stream_event(event: str, data: dict, stream_format: str) -> str:
+    if stream_format == "sse":
+        payload = orjson.dumps(data, default=str).decode()
+        return f"event: {event}\ndata: {payload}\n\n"
+    return orjson.dumps({"event": event, "data": data}, default=str).decode() + "\n"
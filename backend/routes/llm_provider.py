@@ -0,0 +1,269 @@
+import asyncio
+import contextlib
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+
+from backend.routes.metrics import LLM_HEDGES, LLM_REQUEST_SECONDS, LLM_RETRIES
+
+load_dotenv()
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-flash")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+# Budget total d'une génération (tentatives, attentes et relance comprises)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+# Délai maximal d'une tentative, borné par ce qui reste du budget
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", 0.5))
+# Requête de secours lancée après le p95 des latences récentes
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 1.0))
+LLM_HEDGE_MIN_SAMPLES = 20
+
+# Erreurs passagères du SDK Gemini (google.api_core), comparées par nom
+# pour ne pas importer le SDK ici
+RETRYABLE_ERRORS = {
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+# Limite globale des appels simultanés au modèle
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+# Latences des tentatives réussies, pour le délai de relance
+_latencies: deque = deque(maxlen=200)
+# Appels au modèle en cours ou en attente du sémaphore
+_active = 0
+
+
+class LLMProvider(ABC):
+    """Fournisseur de modèle : une seule instance, partagée par toutes les requêtes."""
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str: ...
+
+    @abstractmethod
+    def stream(self, prompt: str) -> AsyncIterator[str]: ...
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self):
+        # Le SDK (long à importer) n'est chargé qu'à la création du fournisseur ;
+        # le modèle garde un seul canal gRPC pour toutes les requêtes
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        self.model = genai.GenerativeModel(model_name=LLM_MODEL)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                yield chunk.text
+            except ValueError:
+                # Morceau sans partie texte (ex: fin de génération)
+                continue
+
+
+class FakeProvider(LLMProvider):
+    """Modèle local (tests, benchmarks, queue de latence simulée)."""
+
+    name = "fake"
+
+    def __init__(self):
+        from backend.routes.fake_model import FakeGenerativeModel
+
+        self.model = FakeGenerativeModel()
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+
+PROVIDERS: dict[str, type[LLMProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    FakeProvider.name: FakeProvider,
+}
+
+_provider: LLMProvider | None = None
+# get_provider est aussi appelé depuis un thread (préchargement au démarrage)
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> LLMProvider:
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = PROVIDERS[LLM_BACKEND]()
+    return _provider
+
+
+def active_requests() -> int:
+    return _active
+
+
+@contextlib.asynccontextmanager
+async def _model_slot():
+    """Place sur le sémaphore ; l'attente compte déjà comme un appel en cours."""
+    global _active
+    _active += 1
+    try:
+        async with llm_semaphore:
+            yield
+    finally:
+        _active -= 1
+
+
+def is_retryable(error: BaseException) -> bool:
+    return isinstance(error, (TimeoutError, ConnectionError)) or (
+        type(error).__name__ in RETRYABLE_ERRORS
+    )
+
+
+def hedge_delay() -> float | None:
+    """p95 des latences récentes ; None tant que l'échantillon est trop petit."""
+    if not LLM_HEDGE_ENABLED or len(_latencies) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(_latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return max(p95, LLM_HEDGE_MIN_DELAY)
+
+
+def remaining(deadline: float) -> float:
+    return deadline - asyncio.get_running_loop().time()
+
+
+async def _attempt(prompt: str, deadline: float) -> str:
+    start = time.perf_counter()
+    async with asyncio.timeout(min(LLM_ATTEMPT_TIMEOUT, remaining(deadline))):
+        text = await get_provider().generate(prompt)
+    _latencies.append(time.perf_counter() - start)
+    return text
+
+
+async def _start_hedge(prompt: str, deadline: float) -> asyncio.Task | None:
+    # La relance prend sa propre place sur le sémaphore, sans attendre :
+    # quand le modèle est saturé, elle aggraverait la file
+    if llm_semaphore.locked():
+        LLM_HEDGES.inc(outcome="skipped")
+        return None
+    # Place libre : acquire() rend la main sans attendre
+    await llm_semaphore.acquire()
+    LLM_HEDGES.inc(outcome="fired")
+    task = asyncio.create_task(_attempt(prompt, deadline))
+    # Rendue à la fin de la tâche, même annulée avant d'avoir démarré
+    task.add_done_callback(lambda _: llm_semaphore.release())
+    return task
+
+
+async def _hedged_attempt(prompt: str, deadline: float) -> str:
+    delay = hedge_delay()
+    primary = asyncio.create_task(_attempt(prompt, deadline))
+    if delay is None or delay >= remaining(deadline):
+        return await primary
+
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            hedge = await _start_hedge(prompt, deadline)
+            if hedge is not None:
+                tasks.add(hedge)
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        LLM_HEDGES.inc(outcome="won")
+                    return task.result()
+        # Les deux tentatives ont échoué : l'erreur de la première est remontée
+        return primary.result()
+    finally:
+        # Tentative perdante annulée et attendue : rien ne tourne après le retour
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def complete(prompt: str, budget: float = LLM_TIMEOUT) -> str:
+    """Réponse complète du modèle, dans un budget de ``budget`` secondes.
+
+    Les erreurs passagères sont retentées avec un backoff exponentiel à
+    gigue totale ; une requête de secours peut doubler une tentative lente.
+    """
+    deadline = asyncio.get_running_loop().time() + budget
+    async with _model_slot():
+        with LLM_REQUEST_SECONDS.time(mode="complete"):
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                try:
+                    return await _hedged_attempt(prompt, deadline)
+                except Exception as e:
+                    backoff = random.uniform(0, LLM_RETRY_BACKOFF * 2**attempt)
+                    if (
+                        attempt == LLM_MAX_RETRIES
+                        or not is_retryable(e)
+                        or backoff >= remaining(deadline)
+                    ):
+                        raise
+                    LLM_RETRIES.inc()
+                    await asyncio.sleep(backoff)
+
+
+async def complete_stream(
+    prompt: str, budget: float = LLM_TIMEOUT
+) -> AsyncIterator[str]:
+    """Morceaux de texte du modèle ; retenté seulement avant le premier morceau.
+
+    La place sur le sémaphore, le budget et la durée mesurée couvrent le flux
+    jusqu'à son dernier morceau lu. ``_merge_streams`` le lit sans attendre
+    le client (file non bornée) : ils ne couvrent donc que la génération.
+    """
+    deadline = asyncio.get_running_loop().time() + budget
+    async with _model_slot(), asyncio.timeout(budget):
+        with LLM_REQUEST_SECONDS.time(mode="stream"):
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                started = False
+                try:
+                    chunks = aiter(get_provider().stream(prompt))
+                    first = await anext(chunks, None)
+                    started = True
+                    if first is not None:
+                        yield first
+                        async for text in chunks:
+                            yield text
+                    return
+                except Exception as e:
+                    backoff = random.uniform(0, LLM_RETRY_BACKOFF * 2**attempt)
+                    if (
+                        started
+                        or attempt == LLM_MAX_RETRIES
+                        or not is_retryable(e)
+                        or backoff >= remaining(deadline)
+                    ):
+                        raise
+                    LLM_RETRIES.inc()
+                    await asyncio.sleep(backoff)
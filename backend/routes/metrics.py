@@ -0,0 +1,183 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY: list = []
+# Fonctions appelées à chaque collecte pour exposer des compteurs existants
+# (caches, pool de connexions) sans les dupliquer
+COLLECTORS: list = []
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        values = self._values or ({} if self.labelnames else {(): 0})
+        for key, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # clé -> [compte par bucket..., somme, total]
+        self._values: dict[tuple, list] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state[-2]}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route.",
+    ("method", "route", "status"),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Durée des appels au modèle de génération.",
+    ("mode",),
+)
+LLM_PARSE_SECONDS = Histogram(
+    "llm_parse_duration_seconds",
+    "Durée du nettoyage et du décodage JSON des réponses du modèle.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+PDF_EXTRACTION_SECONDS = Histogram(
+    "pdf_extraction_duration_seconds",
+    "Durée de l'extraction du texte des PDF (hors cache).",
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Durée des requêtes SQL.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+QUOTA_REJECTIONS = Counter(
+    "quota_rejections_total", "Générations refusées faute de quota."
+)
+LLM_TOPUPS = Counter(
+    "llm_topup_requests_total",
+    "Appels complémentaires pour les questions manquantes ou invalides.",
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total", "Tentatives relancées après une erreur passagère du modèle."
+)
+LLM_HEDGES = Counter(
+    "llm_hedged_requests_total",
+    "Requêtes de secours : lancées (fired), gagnantes (won), écartées (skipped).",
+    ("outcome",),
+)
+LLM_DISCARDED_QUESTIONS = Counter(
+    "llm_discarded_questions_total",
+    "Questions renvoyées par le modèle mais rejetées à la validation.",
+)
+GENERATION_ERRORS = Counter(
+    "generation_errors_total", "Échecs de génération par cause.", ("reason",)
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence par route (gabarit de chemin, pas l'URL brute)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=route.path if route else "unmatched",
+                status=status,
+            )
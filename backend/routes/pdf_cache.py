@@ -0,0 +1,90 @@
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from backend.database.db import async_session
+from backend.database.models import PdfTextCache
+
+PDF_TEXT_CACHE_MAX_BYTES = int(os.getenv("PDF_TEXT_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+pdf_cache_stats = {"hits": 0, "misses": 0}
+
+
+def pdf_cache_hit_rate() -> float:
+    total = pdf_cache_stats["hits"] + pdf_cache_stats["misses"]
+    return pdf_cache_stats["hits"] / total if total else 0.0
+
+
+def normalize_pages(pages: list[str]) -> tuple[str, list[int]]:
+    """Normalise le texte de chaque page et renvoie le texte joint et l'offset de chaque page."""
+    normalized, offsets = [], []
+    position = 0
+    for page in pages:
+        page = page.replace("\xa0", " ")
+        page = re.sub(r"[ \t]+\n", "\n", page)
+        page = re.sub(r"\n{3,}", "\n\n", page)
+        offsets.append(position)
+        normalized.append(page)
+        position += len(page)
+    return "".join(normalized), offsets
+
+
+async def get_cached_extraction(sha256: str) -> PdfTextCache | None:
+    async with async_session() as session:
+        entry = await session.get(PdfTextCache, sha256)
+        if entry is None:
+            pdf_cache_stats["misses"] += 1
+            return None
+
+        pdf_cache_stats["hits"] += 1
+        entry.hits += 1
+        entry.last_used_at = datetime.now()
+        await session.commit()
+        return entry
+
+
+async def store_extraction(sha256: str, pages: list[str]) -> PdfTextCache:
+    text_content, page_offsets = normalize_pages(pages)
+    entry = PdfTextCache(
+        sha256=sha256,
+        text_content=text_content,
+        page_count=len(pages),
+        page_offsets=page_offsets,
+        size_bytes=len(text_content.encode("utf-8")),
+    )
+    async with async_session() as session:
+        session.add(entry)
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            return entry
+        await evict_extractions(session)
+    return entry
+
+
+async def evict_extractions(session: AsyncSession):
+    # LRU en une requête : cumul des tailles du plus récent au plus ancien,
+    # suppression de tout ce qui dépasse la limite (rien ne remonte à l'app)
+    running_total = (
+        func.sum(PdfTextCache.size_bytes)
+        .over(order_by=(PdfTextCache.last_used_at.desc(), PdfTextCache.sha256))
+        .label("running_total")
+    )
+    ranked = select(PdfTextCache.sha256, running_total).subquery()
+    result = await session.execute(
+        delete(PdfTextCache).where(
+            PdfTextCache.sha256.in_(
+                select(ranked.c.sha256).where(
+                    ranked.c.running_total > PDF_TEXT_CACHE_MAX_BYTES
+                )
+            )
+        )
+    )
+    if result.rowcount:
+        await session.commit()
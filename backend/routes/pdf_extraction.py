@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import UploadFile, HTTPException
+
+from backend.routes.metrics import PDF_EXTRACTION_SECONDS
+from backend.routes.pdf_cache import get_cached_extraction, store_extraction
+
+MAX_FILE_SIZE = 15 * 1024 * 1024  # 15 MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 300))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 25))
+
+_pdf_pool: ProcessPoolExecutor | None = None
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        # forkserver : un fork du processus de l'app (déjà multi-thread :
+        # bcrypt, to_thread, aiosqlite) peut bloquer l'enfant sur un verrou
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# PyMuPDF n'est importé que dans les processus d'extraction, au premier PDF
+def _count_pages(path: str) -> int:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+async def spool_upload(file: UploadFile) -> tuple[str, str]:
+    """Copie l'upload sur disque par morceaux en vérifiant la taille au fil de l'eau.
+
+    Renvoie le chemin du fichier temporaire et le SHA-256 de son contenu.
+    """
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail="Le fichier PDF est trop volumineux. La limite est de 15 Mo.",
+                )
+            digest.update(chunk)
+            await asyncio.to_thread(tmp.write, chunk)
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        raise
+    tmp.close()
+    return tmp.name, digest.hexdigest()
+
+
+async def extract_pages(path: str) -> list[str]:
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+
+    page_count = await loop.run_in_executor(pool, _count_pages, path)
+    page_count = min(page_count, PDF_MAX_PAGES)
+
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _extract_page_range, path, start, stop)
+            for start, stop in ranges
+        )
+    )
+    return [page for pages in results for page in pages]
+
+
+async def extract_text_from_pdf(file: UploadFile) -> str:
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail="Le fichier PDF est trop volumineux. La limite est de 15 Mo.",
+        )
+
+    if file.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=400,
+            detail="Type de fichier invalide. Seuls les PDF sont acceptés.",
+        )
+
+    path, sha256 = await spool_upload(file)
+    try:
+        cached = await get_cached_extraction(sha256)
+        if cached is not None:
+            return cached.text_content
+        with PDF_EXTRACTION_SECONDS.time():
+            pages = await extract_pages(path)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors du traitement du PDF: {str(e)}"
+        )
+    finally:
+        os.unlink(path)
+
+    if not "".join(pages).strip():
+        raise HTTPException(
+            status_code=400, detail="Le PDF ne contient aucun texte extractible."
+        )
+
+    entry = await store_extraction(sha256, pages)
+    return entry.text_content
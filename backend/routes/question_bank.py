@@ -0,0 +1,212 @@
+import hashlib
+import itertools
+import os
+import random
+import re
+import unicodedata
+from collections import OrderedDict, defaultdict
+
+from sqlmodel import select
+
+from backend.database.db import async_session
+from backend.database.models import BankQuestion
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+# Questions gardées en mémoire (les plus récentes) pour l'index
+QUESTION_BANK_MAX_SIZE = int(os.getenv("QUESTION_BANK_MAX_SIZE", 20000))
+# Jaccard minimal entre les mots du sujet demandé et ceux du sujet d'origine
+QUESTION_BANK_MIN_TOPIC_SIMILARITY = float(
+    os.getenv("QUESTION_BANK_MIN_TOPIC_SIMILARITY", 0.6)
+)
+
+# MinHash sur des 3-grammes de mots, LSH en 8 bandes de 4 lignes
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+SHINGLE_SIZE = 3
+DUPLICATE_SIMILARITY = 0.8
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+STOPWORDS = set(
+    "le la les un une des du de d l au aux et en dans sur pour par avec que qui "
+    "est sont the and of to in for on with is".split()
+)
+WORD = re.compile(r"\w+")
+
+bank_stats = {
+    "full_hits": 0,
+    "partial_hits": 0,
+    "misses": 0,
+    "questions_served": 0,
+    "questions_added": 0,
+    "duplicates_skipped": 0,
+}
+
+
+def words(text: str) -> list[str]:
+    # Sans accents : "Révolution" et "revolution" désignent le même sujet
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [word for word in WORD.findall(text) if word not in STOPWORDS]
+
+
+def minhash(text: str) -> tuple[int, ...]:
+    tokens = words(text)
+    shingles = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+class QuestionIndex:
+    """Index lexical en mémoire des questions de la banque.
+
+    Un index inversé sur les mots des sujets retrouve les questions d'un
+    sujet proche ; les signatures MinHash (regroupées par bandes LSH)
+    repèrent les quasi-doublons sans comparer chaque paire.
+    """
+
+    def __init__(self):
+        self.entries: OrderedDict[int, dict] = OrderedDict()
+        self.topic_index: defaultdict[str, set[int]] = defaultdict(set)
+        self.buckets: defaultdict[tuple, set[int]] = defaultdict(set)
+        self._ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _bands(signature: tuple[int, ...]) -> list[tuple]:
+        rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        return [
+            (band, signature[band * rows : (band + 1) * rows])
+            for band in range(LSH_BANDS)
+        ]
+
+    def find_duplicate(self, signature: tuple[int, ...]) -> int | None:
+        candidates = set()
+        for band in self._bands(signature):
+            candidates |= self.buckets.get(band, set())
+        for entry_id in candidates:
+            other = self.entries[entry_id]["signature"]
+            same = sum(a == b for a, b in zip(signature, other))
+            if same / MINHASH_PERMUTATIONS >= DUPLICATE_SIMILARITY:
+                return entry_id
+        return None
+
+    def add(self, topic: str, difficulty: str, element: dict) -> bool:
+        """Indexe la question ; renvoie False si un quasi-doublon existe déjà."""
+        signature = minhash(element["question"])
+        if self.find_duplicate(signature) is not None:
+            return False
+
+        entry_id = next(self._ids)
+        topic_words = frozenset(words(topic))
+        self.entries[entry_id] = {
+            "topic_words": topic_words,
+            "difficulty": difficulty.strip().lower(),
+            "signature": signature,
+            "element": element,
+        }
+        for word in topic_words:
+            self.topic_index[word].add(entry_id)
+        for band in self._bands(signature):
+            self.buckets[band].add(entry_id)
+
+        while len(self.entries) > QUESTION_BANK_MAX_SIZE:
+            self._remove(next(iter(self.entries)))
+        return True
+
+    def _remove(self, entry_id: int):
+        entry = self.entries.pop(entry_id)
+        for word in entry["topic_words"]:
+            self.topic_index[word].discard(entry_id)
+            if not self.topic_index[word]:
+                del self.topic_index[word]
+        for band in self._bands(entry["signature"]):
+            self.buckets[band].discard(entry_id)
+            if not self.buckets[band]:
+                del self.buckets[band]
+
+    def matches(self, topic: str, difficulty: str) -> list[dict]:
+        topic_words = set(words(topic))
+        difficulty = difficulty.strip().lower()
+        candidates = set()
+        for word in topic_words:
+            candidates |= self.topic_index.get(word, set())
+
+        found = []
+        for entry_id in candidates:
+            entry = self.entries[entry_id]
+            if entry["difficulty"] != difficulty:
+                continue
+            union = topic_words | entry["topic_words"]
+            similarity = len(topic_words & entry["topic_words"]) / len(union)
+            if similarity >= QUESTION_BANK_MIN_TOPIC_SIMILARITY:
+                found.append(entry["element"])
+        return found
+
+
+index = QuestionIndex()
+
+
+async def load_question_bank():
+    if not QUESTION_BANK_ENABLED:
+        return
+    async with async_session() as session:
+        result = await session.execute(
+            select(BankQuestion.topic, BankQuestion.difficulty, BankQuestion.element)
+            .order_by(BankQuestion.id.desc())
+            .limit(QUESTION_BANK_MAX_SIZE)
+        )
+        rows = result.all()
+    # Du plus ancien au plus récent : l'ordre d'éviction reste celui d'insertion
+    for topic, difficulty, element in reversed(rows):
+        index.add(topic, difficulty, element)
+
+
+def assemble_from_bank(topic: str, difficulty: str, n: int) -> list[dict]:
+    """Tire au plus ``n`` questions distinctes de la banque pour ce sujet."""
+    if not QUESTION_BANK_ENABLED:
+        return []
+    found = index.matches(topic, difficulty)
+    questions = random.sample(found, min(n, len(found)))
+
+    if len(questions) == n:
+        bank_stats["full_hits"] += 1
+    elif questions:
+        bank_stats["partial_hits"] += 1
+    else:
+        bank_stats["misses"] += 1
+    bank_stats["questions_served"] += len(questions)
+    return questions
+
+
+async def add_to_bank(topic: str, difficulty: str, questions: list[dict]):
+    if not QUESTION_BANK_ENABLED:
+        return
+    # Indexées avant l'écriture : deux requêtes simultanées ne stockent pas
+    # le même doublon.
+    new = [question for question in questions if index.add(topic, difficulty, question)]
+    bank_stats["questions_added"] += len(new)
+    bank_stats["duplicates_skipped"] += len(questions) - len(new)
+    if not new:
+        return
+
+    async with async_session() as session:
+        session.add_all(
+            BankQuestion(topic=topic, difficulty=difficulty, element=question)
+            for question in new
+        )
+        await session.commit()
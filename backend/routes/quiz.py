@@ -1,154 +1,504 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+import asyncio
+import os
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    File,
+    UploadFile,
+    Form,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.params import Depends
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
 
-from backend.auth.jwt import SECRET_KEY, ALGORITHM
-from backend.database.models import Quiz, Quota
-from backend.database.schemas import QuizRequest, QuizResponse, QuizUpdate
-from backend.database.db import get_async_session
+from backend.auth.dependencies import get_current_user
+from backend.database.models import Quiz
+from backend.database.schemas import (
+    CurrentUser,
+    QuizBatchRequest,
+    QuizBatchResponse,
+    QuizRequest,
+    QuizResponse,
+    QuizUpdate,
+)
+from backend.database.db import async_session, get_async_session
 from backend.routes.generate_quizzes import (
-    generate_quiz_from_text_with_ai,
-    extract_text_from_pdf,
+    TIMEOUT_ERROR,
+    stream_quiz_from_text_with_ai,
+)
+from backend.routes.generation_cache import (
+    generate_quiz_cached,
+    get_cached_generation,
+    make_generation_key,
+    store_generation,
+    topic_text,
+)
+from backend.routes.pdf_extraction import extract_text_from_pdf
+from backend.routes.json_stream import format_stream_event
+from backend.routes.metrics import GENERATION_ERRORS, QUOTA_REJECTIONS
+from backend.routes.stats import parse_result, record_quiz_result
+from backend.routes.helper import (
+    compute_etag,
+    debit_quota,
+    decode_history_cursor,
+    encode_history_cursor,
+    refund_quota,
+    refund_quota_now,
+    save_quiz_with_questions,
+    save_quizzes_with_questions,
 )
-from backend.routes.helper import reset_quota_if_needed
 
 router = APIRouter()
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Générations simultanées par requête batch
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
 
 
 @router.post("/generate-quiz-from-topic", response_model=QuizResponse)
 async def quiz_from_topic(
     data: QuizRequest,
-    token: str = Depends(oauth2_scheme),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=400, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user_quota = await session.execute(select(Quota).where(Quota.user_id == user_id))
-    user_quota = user_quota.scalar_one_or_none()
-    user_quota = await reset_quota_if_needed(session, user_quota)
-    if user_quota.quota_remaining <= 0:
+    quota_remaining = await debit_quota(session, current_user.id)
+    await session.commit()
+    if quota_remaining is None:
+        QUOTA_REJECTIONS.inc()
         raise HTTPException(status_code=401, detail="No quota remaining")
 
-    new_quizzes = generate_quiz_from_text_with_ai(
-        f"Sujet: {data.topic}", data.difficulty, data.number_of_questions
+    # Remboursé si la génération ou l'enregistrement échoue, quelle qu'en soit la cause
+    saved = False
+    try:
+        new_quizzes = await generate_quiz_cached(
+            topic_text(data.topic),
+            data.difficulty,
+            data.number_of_questions,
+            bypass_cache=data.bypass_cache,
+            topic=data.topic,
+        )
+        if "error" in new_quizzes:
+            raise HTTPException(status_code=500, detail=new_quizzes["error"])
+
+        new_quizzes_list = new_quizzes.get("quizzes", [])
+        new_quizz = await save_quiz_with_questions(
+            session,
+            data.topic,
+            current_user.id,
+            new_quizzes_list,
+            difficulty=data.difficulty,
+            number_of_questions=data.number_of_questions,
+        )
+        await session.commit()
+        saved = True
+    finally:
+        if not saved:
+            await refund_quota_now(current_user.id)
+
+    return ORJSONResponse(
+        {
+            "id": new_quizz.id,
+            "title": new_quizz.title,
+            "created_at": new_quizz.created_at,
+            "elements": new_quizzes_list,
+            "quota_remaining": quota_remaining,
+        }
     )
 
-    if "error" in new_quizzes:
-        raise HTTPException(status_code=500, detail=new_quizzes["error"])
 
-    new_quizz = Quiz(title=data.topic, user_id=user_id)
-    session.add(new_quizz)
+@router.post("/generate-quizzes-from-topics", response_model=QuizBatchResponse)
+async def quizzes_from_topics(
+    data: QuizBatchRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Tout le lot est débité d'un coup ; les échecs sont remboursés à la fin
+    quota_remaining = await debit_quota(session, current_user.id, len(data.items))
     await session.commit()
-    await session.refresh(new_quizz)
+    if quota_remaining is None:
+        QUOTA_REJECTIONS.inc()
+        raise HTTPException(status_code=401, detail="No quota remaining")
 
-    new_quizzes_list = new_quizzes.get("quizzes", [])
-    user_quota.quota_remaining -= 1
-    await session.commit()
-    await session.refresh(user_quota)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def generate(item: QuizRequest) -> dict:
+        async with semaphore:
+            try:
+                return await generate_quiz_cached(
+                    topic_text(item.topic),
+                    item.difficulty,
+                    item.number_of_questions,
+                    bypass_cache=item.bypass_cache,
+                    topic=item.topic,
+                )
+            except Exception as e:
+                print(e)
+                return {"error": str(e)}
+
+    saved = False
+    try:
+        results = await asyncio.gather(*(generate(item) for item in data.items))
 
-    return {
-        "id": new_quizz.id,
-        "title": new_quizz.title,
-        "created_at": new_quizz.created_at,
-        "elements": new_quizzes_list,
-    }
+        succeeded = [
+            {
+                "title": item.topic,
+                "elements": result["quizzes"],
+                "difficulty": item.difficulty,
+                "number_of_questions": item.number_of_questions,
+            }
+            for item, result in zip(data.items, results)
+            if "error" not in result
+        ]
+        failed = len(data.items) - len(succeeded)
+        saved_quizzes = iter(
+            await save_quizzes_with_questions(session, current_user.id, succeeded)
+            if succeeded
+            else []
+        )
+        # Remboursement des échecs dans la transaction de l'enregistrement
+        if failed:
+            refunded = await refund_quota(session, current_user.id, failed)
+            if refunded is not None:
+                quota_remaining = refunded
+        await session.commit()
+        saved = True
+    finally:
+        if not saved:
+            # Rien n'a été enregistré : tout le lot est rendu
+            await refund_quota_now(current_user.id, len(data.items))
+
+    items = []
+    for item, result in zip(data.items, results):
+        if "error" in result:
+            items.append(
+                {"topic": item.topic, "status": "failed", "error": result["error"]}
+            )
+            continue
+        quiz_id, created_at = next(saved_quizzes)
+        items.append(
+            {
+                "topic": item.topic,
+                "status": "succeeded",
+                "quiz": {
+                    "id": quiz_id,
+                    "title": item.topic,
+                    "created_at": created_at,
+                    "elements": result["quizzes"],
+                },
+            }
+        )
+
+    return ORJSONResponse(
+        {
+            "items": items,
+            "succeeded": len(succeeded),
+            "failed": failed,
+            "quota_remaining": quota_remaining,
+        }
+    )
 
 
 @router.post("/generate-quiz-from-pdf", response_model=QuizResponse)
 async def quiz_from_pdf(
-    token: str = Depends(oauth2_scheme),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session),
     difficulty: str = Form(...),
     number_of_questions: int = Form(...),
     file: UploadFile = File(...),
+    bypass_cache: bool = Form(False),
 ):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=400, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user_quota = await session.execute(select(Quota).where(Quota.user_id == user_id))
-    user_quota = user_quota.scalar_one_or_none()
-    user_quota = await reset_quota_if_needed(session, user_quota)
-    if user_quota.quota_remaining <= 0:
+    quota_remaining = await debit_quota(session, current_user.id)
+    await session.commit()
+    if quota_remaining is None:
+        QUOTA_REJECTIONS.inc()
         raise HTTPException(status_code=401, detail="No quota remaining")
 
     quiz_title = file.filename or "Quiz from PDF"
+    saved = False
     try:
         text_content = await extract_text_from_pdf(file)
-    except HTTPException as e:
-        raise e
+        new_quizzes = await generate_quiz_cached(
+            text_content, difficulty, number_of_questions, bypass_cache=bypass_cache
+        )
+        if "error" in new_quizzes:
+            raise HTTPException(status_code=500, detail=new_quizzes["error"])
+
+        new_quizzes_list = new_quizzes.get("quizzes", [])
+        new_quizz = await save_quiz_with_questions(
+            session, quiz_title, current_user.id, new_quizzes_list
+        )
+        await session.commit()
+        saved = True
+    finally:
+        if not saved:
+            await refund_quota_now(current_user.id)
+
+    return ORJSONResponse(
+        {
+            "id": new_quizz.id,
+            "title": new_quizz.title,
+            "created_at": new_quizz.created_at,
+            "elements": new_quizzes_list,
+            "quota_remaining": quota_remaining,
+        }
+    )
+
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def stream_quiz_response(
+    user_id: int,
+    title: str,
+    text_content: str,
+    difficulty: str,
+    n: int,
+    bypass_cache: bool,
+    stream_format: str,
+    quota_remaining: int,
+    from_topic: bool = False,
+) -> StreamingResponse:
+    # La réponse est envoyée après la sortie des dépendances :
+    # le générateur ouvre ses propres sessions.
+    async def event_stream():
+        key = make_generation_key(text_content, difficulty, n)
+        elements = []
+        # Remboursé dans le finally : erreur, mais aussi déconnexion du client
+        # (GeneratorExit / annulation, qui ne passent pas par ``except``)
+        saved = False
+        try:
+            cached = None if bypass_cache else await get_cached_generation(key)
+            try:
+                if cached is not None:
+                    for question in cached:
+                        elements.append(question)
+                        yield format_stream_event("question", question, stream_format)
+                else:
+                    async for question in stream_quiz_from_text_with_ai(
+                        text_content, difficulty, n
+                    ):
+                        elements.append(question)
+                        yield format_stream_event("question", question, stream_format)
+            except TimeoutError:
+                GENERATION_ERRORS.inc(reason="timeout")
+                yield format_stream_event(
+                    "error", {"detail": TIMEOUT_ERROR}, stream_format
+                )
+                return
+            except Exception as e:
+                print(e)
+                GENERATION_ERRORS.inc(reason="llm")
+                yield format_stream_event(
+                    "error", {"detail": str(e) or type(e).__name__}, stream_format
+                )
+                return
+
+            if not elements:
+                yield format_stream_event(
+                    "error",
+                    {"detail": "Aucune question valide générée."},
+                    stream_format,
+                )
+                return
+
+            if cached is None and len(elements) == n:
+                await store_generation(key, elements)
+
+            async with async_session() as session:
+                new_quizz = await save_quiz_with_questions(
+                    session,
+                    title,
+                    user_id,
+                    elements,
+                    difficulty=difficulty if from_topic else None,
+                    number_of_questions=n if from_topic else None,
+                )
+                await session.commit()
+            saved = True
+        finally:
+            if not saved:
+                await refund_quota_now(user_id)
+
+        yield format_stream_event(
+            "done",
+            {
+                "id": new_quizz.id,
+                "title": new_quizz.title,
+                "created_at": new_quizz.created_at.isoformat(),
+                "quota_remaining": quota_remaining,
+            },
+            stream_format,
+        )
 
-    new_quizzes = generate_quiz_from_text_with_ai(
-        text_content, difficulty, number_of_questions
+    return StreamingResponse(
+        event_stream(), media_type=STREAM_MEDIA_TYPES[stream_format]
     )
 
-    if "error" in new_quizzes:
-        raise HTTPException(status_code=500, detail=new_quizzes["error"])
 
-    new_quizz = Quiz(title=quiz_title, user_id=user_id)
-    session.add(new_quizz)
+@router.post("/generate-quiz-from-topic/stream")
+async def quiz_from_topic_stream(
+    data: QuizRequest,
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    quota_remaining = await debit_quota(session, current_user.id)
     await session.commit()
-    await session.refresh(new_quizz)
+    if quota_remaining is None:
+        QUOTA_REJECTIONS.inc()
+        raise HTTPException(status_code=401, detail="No quota remaining")
 
-    new_quizzes_list = new_quizzes.get("quizzes", [])
-    user_quota.quota_remaining -= 1
+    return stream_quiz_response(
+        current_user.id,
+        data.topic,
+        topic_text(data.topic),
+        data.difficulty,
+        data.number_of_questions,
+        data.bypass_cache,
+        stream_format,
+        quota_remaining,
+        from_topic=True,
+    )
+
+
+@router.post("/generate-quiz-from-pdf/stream")
+async def quiz_from_pdf_stream(
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    difficulty: str = Form(...),
+    number_of_questions: int = Form(...),
+    file: UploadFile = File(...),
+    bypass_cache: bool = Form(False),
+):
+    quota_remaining = await debit_quota(session, current_user.id)
     await session.commit()
-    await session.refresh(user_quota)
+    if quota_remaining is None:
+        QUOTA_REJECTIONS.inc()
+        raise HTTPException(status_code=401, detail="No quota remaining")
 
-    return {
-        "id": new_quizz.id,
-        "title": new_quizz.title,
-        "created_at": new_quizz.created_at,
-        "elements": new_quizzes_list,
-    }
+    try:
+        text_content = await extract_text_from_pdf(file)
+    except BaseException:
+        await refund_quota_now(current_user.id)
+        raise
+
+    return stream_quiz_response(
+        current_user.id,
+        file.filename or "Quiz from PDF",
+        text_content,
+        difficulty,
+        number_of_questions,
+        bypass_cache,
+        stream_format,
+        quota_remaining,
+    )
 
 
 @router.get("/quizzes-history", response_model=list[QuizResponse])
 async def quizzes_history(
-    token: str = Depends(oauth2_scheme),
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    include_total: bool = False,
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    # Pagination par curseur sur (created_at DESC, id DESC), servie par
+    # l'index ix_quiz_user_id_created_at_id.
+    query = select(Quiz).where(Quiz.user_id == current_user.id)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_history_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(Quiz.created_at, Quiz.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    query = query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1)
+
+    quizzes = (await session.execute(query)).scalars().all()
+    next_cursor = None
+    if len(quizzes) > limit:
+        quizzes = quizzes[:limit]
+        next_cursor = encode_history_cursor(quizzes[-1])
+
+    total = None
+    if include_total:
+        total = await session.scalar(
+            select(func.count()).where(Quiz.user_id == current_user.id)
+        )
+
+    items = [quiz.to_dict() for quiz in quizzes]
+    headers = {"ETag": compute_etag(items, next_cursor, total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return ORJSONResponse(items, headers=headers)
+
+
+@router.get("/quizzes/{quiz_id}", response_model=QuizResponse)
+async def quiz_detail(
+    quiz_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    result = await session.execute(
+        select(Quiz)
+        .options(joinedload(Quiz.questions))
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
+    )
+    quiz = result.unique().scalar_one_or_none()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
 
-    quizzes = await session.execute(select(Quiz).where(Quiz.user_id == user_id))
-    return quizzes.scalars().all()
+    return ORJSONResponse(
+        {
+            **quiz.to_dict(),
+            "elements": [question.to_dict() for question in quiz.questions],
+        }
+    )
 
 
 @router.patch("/quizzes-resul/{quiz_id}")
 async def update_quiz_result(
-    quiz_id: int, data: QuizUpdate, session: AsyncSession = Depends(get_async_session)
+    quiz_id: int,
+    data: QuizUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    result = await session.execute(select(Quiz).where(Quiz.id == quiz_id))
+    result = await session.execute(
+        select(Quiz).where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
+        # Deux envois simultanés du même résultat ne le comptent pas deux fois
+        .with_for_update()
+    )
     cur_quiz = result.scalar_one_or_none()
 
     if not cur_quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    cur_quiz.result = data.result
+    score, max_score = data.score, data.max_score
+    if score is None or max_score is None:
+        score, max_score = parse_result(data.result) or (None, None)
+    if score is None or score > max_score:
+        raise HTTPException(status_code=400, detail="Invalid result")
+
+    cur_quiz.result = data.result or f"{score}/{max_score}"
+    # Résultat et agrégats de /stats dans la même transaction
+    await record_quiz_result(session, cur_quiz, score, max_score, data.duration_seconds)
 
     session.add(cur_quiz)
     await session.commit()
-    await session.refresh(cur_quiz)
 
-    return {"message": "Quiz updated", "quiz": cur_quiz}
+    return ORJSONResponse({"message": "Quiz updated", "quiz": cur_quiz.to_dict()})
@@ -0,0 +1,188 @@
+import os
+import re
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException
+from fastapi.params import Depends
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from backend.auth.dependencies import get_current_user
+from backend.database.db import get_async_session
+from backend.database.models import Quiz, UserStat
+from backend.database.schemas import CurrentUser
+
+router = APIRouter()
+
+# Sujets renvoyés par /stats, les plus pratiqués d'abord
+STATS_TOP_TOPICS = int(os.getenv("STATS_TOP_TOPICS", 20))
+
+RESULT = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+COUNTERS = (
+    "quizzes",
+    "total_score",
+    "total_max_score",
+    "timed_quizzes",
+    "total_duration_seconds",
+)
+
+
+def parse_result(result: str | None) -> tuple[int, int] | None:
+    """Score et maximum d'un texte "7/10" ; None si ce n'est pas un score valide."""
+    match = RESULT.match(result or "")
+    if not match:
+        return None
+    score, max_score = int(match.group(1)), int(match.group(2))
+    # Même règle que PATCH /quizzes-resul : 0 <= score <= max_score, max >= 1
+    if max_score < 1 or score > max_score:
+        return None
+    return score, max_score
+
+
+def topic_key(title: str) -> str:
+    return " ".join(title.lower().split())[:255]
+
+
+def contribution(
+    score: int | None, max_score: int | None, duration_seconds: int | None
+) -> dict[str, int]:
+    if score is None:
+        return dict.fromkeys(COUNTERS, 0)
+    return {
+        "quizzes": 1,
+        "total_score": score,
+        "total_max_score": max_score,
+        "timed_quizzes": int(duration_seconds is not None),
+        "total_duration_seconds": duration_seconds or 0,
+    }
+
+
+async def _add_to_stat(
+    db: AsyncSession, user_id: int, dimension: str, key: str, delta: dict[str, int]
+):
+    # Incrément atomique ; la ligne n'est créée qu'au premier résultat
+    for _ in range(2):
+        result = await db.execute(
+            update(UserStat)
+            .where(
+                UserStat.user_id == user_id,
+                UserStat.dimension == dimension,
+                UserStat.key == key,
+            )
+            .values(
+                updated_at=datetime.now(),
+                **{name: getattr(UserStat, name) + delta[name] for name in COUNTERS},
+            )
+        )
+        if result.rowcount:
+            return
+        try:
+            async with db.begin_nested():
+                db.add(UserStat(user_id=user_id, dimension=dimension, key=key, **delta))
+            return
+        except IntegrityError:
+            # Ligne insérée entre-temps par une autre requête : on incrémente
+            continue
+    # Ni mise à jour ni insertion : le résultat ne doit pas être enregistré
+    # sans ses agrégats (la transaction de l'appelant est annulée)
+    print(f"❌ Stats: mise à jour impossible pour {user_id} ({dimension}/{key})")
+    raise HTTPException(status_code=409, detail="Concurrent update, retry")
+
+
+async def record_quiz_result(
+    db: AsyncSession,
+    quiz: Quiz,
+    score: int,
+    max_score: int,
+    duration_seconds: int | None = None,
+):
+    """Enregistre le résultat et met à jour les agrégats dans la même transaction.
+
+    Un quiz déjà noté n'est compté qu'une fois : seul l'écart avec l'ancien
+    résultat est reporté. Le commit est laissé à l'appelant.
+    """
+    old = contribution(quiz.score, quiz.max_score, quiz.duration_seconds)
+    new = contribution(score, max_score, duration_seconds)
+    delta = {name: new[name] - old[name] for name in COUNTERS}
+
+    quiz.score = score
+    quiz.max_score = max_score
+    quiz.duration_seconds = duration_seconds
+    if not any(delta.values()):
+        return
+
+    dimensions = [("total", ""), ("topic", topic_key(quiz.title))]
+    if quiz.difficulty:
+        dimensions.append(("difficulty", quiz.difficulty.strip().lower()))
+    for dimension, key in dimensions:
+        await _add_to_stat(db, quiz.user_id, dimension, key, delta)
+
+
+def summarize(stat: UserStat | None) -> dict:
+    if stat is None:
+        return {
+            "quizzes": 0,
+            "total_score": 0,
+            "total_max_score": 0,
+            "average_score": None,
+            "success_rate": None,
+            "average_duration_seconds": None,
+        }
+    return {
+        "quizzes": stat.quizzes,
+        "total_score": stat.total_score,
+        "total_max_score": stat.total_max_score,
+        "average_score": (
+            round(stat.total_score / stat.quizzes, 2) if stat.quizzes else None
+        ),
+        "success_rate": (
+            round(stat.total_score / stat.total_max_score, 4)
+            if stat.total_max_score
+            else None
+        ),
+        "average_duration_seconds": (
+            round(stat.total_duration_seconds / stat.timed_quizzes, 1)
+            if stat.timed_quizzes
+            else None
+        ),
+    }
+
+
+@router.get("/stats")
+async def user_stats(
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Lecture des agrégats seulement : aucun parcours de l'historique
+    result = await session.execute(
+        select(UserStat).where(
+            UserStat.user_id == current_user.id,
+            UserStat.dimension.in_(("total", "difficulty")),
+        )
+    )
+    stats = result.scalars().all()
+    topics = await session.execute(
+        select(UserStat)
+        .where(UserStat.user_id == current_user.id, UserStat.dimension == "topic")
+        .order_by(UserStat.quizzes.desc(), UserStat.updated_at.desc())
+        .limit(STATS_TOP_TOPICS)
+    )
+
+    total = next((stat for stat in stats if stat.dimension == "total"), None)
+    return ORJSONResponse(
+        {
+            **summarize(total),
+            "by_difficulty": [
+                {"difficulty": stat.key, **summarize(stat)}
+                for stat in stats
+                if stat.dimension == "difficulty"
+            ],
+            "by_topic": [
+                {"topic": stat.key, **summarize(stat)}
+                for stat in topics.scalars().all()
+            ],
+        }
+    )
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from backend.database.db import async_session
+from backend.database.models import Quiz
+from backend.routes.generate_quizzes import generate_quiz_from_document
+from backend.routes.generation_cache import (
+    WARM_POOL_TTL,
+    has_cached_generation,
+    inflight,
+    make_generation_key,
+    pregenerated,
+    topic_text,
+    warm_pool_stats,
+)
+from backend.routes.llm_provider import active_requests
+
+WARM_POOL_ENABLED = os.getenv("WARM_POOL_ENABLED", "false").lower() == "true"
+WARM_POOL_INTERVAL = float(os.getenv("WARM_POOL_INTERVAL", 60))
+# Sujets suivis, quiz d'avance par sujet et taille totale du pool
+WARM_POOL_TOPICS = int(os.getenv("WARM_POOL_TOPICS", 20))
+WARM_POOL_PER_TOPIC = int(os.getenv("WARM_POOL_PER_TOPIC", 2))
+WARM_POOL_MAX_SIZE = int(os.getenv("WARM_POOL_MAX_SIZE", 40))
+# Popularité : demandes sur la fenêtre glissante
+WARM_POOL_MIN_REQUESTS = int(os.getenv("WARM_POOL_MIN_REQUESTS", 3))
+WARM_POOL_WINDOW = timedelta(days=int(os.getenv("WARM_POOL_WINDOW_DAYS", 7)))
+# Budget d'appels au modèle consacrés au pool, par heure et par worker
+WARM_POOL_MAX_CALLS_PER_HOUR = int(os.getenv("WARM_POOL_MAX_CALLS_PER_HOUR", 20))
+
+_task: asyncio.Task | None = None
+_recent_calls: deque = deque()
+
+
+async def rank_popular_topics() -> list[tuple[str, str, str, int]]:
+    """(clé, sujet, difficulté, nombre) les plus demandés, du plus populaire au moins."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(
+                Quiz.title,
+                Quiz.difficulty,
+                Quiz.number_of_questions,
+                func.count().label("requests"),
+            )
+            .where(
+                Quiz.difficulty.is_not(None),
+                Quiz.created_at >= datetime.now() - WARM_POOL_WINDOW,
+            )
+            .group_by(Quiz.title, Quiz.difficulty, Quiz.number_of_questions)
+        )
+
+    # Regroupement par clé normalisée ("Python" et "python " sont le même sujet)
+    popular: dict[str, list] = {}
+    for title, difficulty, n, requests in result.all():
+        key = make_generation_key(topic_text(title), difficulty, n)
+        entry = popular.setdefault(key, [key, title, difficulty, n, 0])
+        entry[4] += requests
+
+    ranked = sorted(popular.values(), key=lambda entry: entry[4], reverse=True)
+    return [
+        (key, title, difficulty, n)
+        for key, title, difficulty, n, requests in ranked[:WARM_POOL_TOPICS]
+        if requests >= WARM_POOL_MIN_REQUESTS
+    ]
+
+
+def pool_size() -> int:
+    return sum(len(entries) for entries in pregenerated.values())
+
+
+def is_idle() -> bool:
+    # Aucune génération utilisateur en cours, ni aucun appel au modèle
+    # (streaming et lots compris) ; le pool n'appelle qu'entre deux tests
+    return not inflight and not active_requests()
+
+
+def budget_available() -> bool:
+    cutoff = time.monotonic() - 3600
+    while _recent_calls and _recent_calls[0] < cutoff:
+        _recent_calls.popleft()
+    return len(_recent_calls) < WARM_POOL_MAX_CALLS_PER_HOUR
+
+
+def drop_stale_entries(keys: set[str]):
+    cutoff = time.monotonic() - WARM_POOL_TTL
+    for key in list(pregenerated):
+        entries = pregenerated[key]
+        if key not in keys:
+            # Sujet sorti du classement
+            warm_pool_stats["evicted"] += len(entries)
+            del pregenerated[key]
+            continue
+        while entries and entries[0][0] < cutoff:
+            entries.popleft()
+            warm_pool_stats["expired"] += 1
+
+
+async def refill_pool():
+    ranked = await rank_popular_topics()
+    drop_stale_entries({key for key, *_ in ranked})
+
+    # Le pool n'est lu qu'après un miss du cache : inutile pour une clé en cache
+    cached = set()
+    for key, *_ in ranked:
+        if await has_cached_generation(key):
+            cached.add(key)
+            warm_pool_stats["skipped_cached"] += 1
+
+    # Un quiz d'avance pour chaque sujet avant d'en préparer un second
+    for depth in range(WARM_POOL_PER_TOPIC):
+        for key, topic, difficulty, n in ranked:
+            if key in cached or len(pregenerated.get(key, ())) > depth:
+                continue
+            if pool_size() >= WARM_POOL_MAX_SIZE:
+                return
+            if not is_idle():
+                warm_pool_stats["skipped_busy"] += 1
+                return
+            if not budget_available():
+                warm_pool_stats["skipped_budget"] += 1
+                return
+
+            _recent_calls.append(time.monotonic())
+            result = await generate_quiz_from_document(topic_text(topic), difficulty, n)
+            if "error" in result:
+                print(f"❌ Warm pool: {result['error']}")
+                continue
+            if len(result["quizzes"]) != n:
+                # Quiz incomplet : il serait servi comme un quiz complet
+                print(f"❌ Warm pool: {len(result['quizzes'])}/{n} questions")
+                continue
+            pregenerated.setdefault(key, deque()).append(
+                (time.monotonic(), result["quizzes"])
+            )
+            warm_pool_stats["generated"] += 1
+
+
+async def warm_pool_loop():
+    while True:
+        await asyncio.sleep(WARM_POOL_INTERVAL)
+        try:
+            await refill_pool()
+        except Exception as e:
+            print(f"❌ Warm pool failed: {e}")
+
+
+def start_warm_pool():
+    global _task
+    if WARM_POOL_ENABLED and _task is None:
+        _task = asyncio.create_task(warm_pool_loop())
+
+
+async def stop_warm_pool():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
@@ -3,10 +3,36 @@ import { useSelector } from 'react-redux';
 import { selectQuizzes } from '../features/userSlice.ts';
 import { useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
+import api from '../apis/api.ts';
+
+// La connexion ne renvoie que les 10 derniers quiz : la suite est paginée
+const LOGIN_QUIZZES = 10;
+const PAGE_SIZE = 20;
 
 function QuizHistory() {
   const quizzes: QuizType[] | null = useSelector(selectQuizzes);
   const [isExpanded, setIsExpanded] = useState(false);
+  const [olderQuizzes, setOlderQuizzes] = useState<QuizType[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [hasMore, setHasMore] = useState(true);
+  const [isLoading, setIsLoading] = useState(false);
+
+  const loadMore = async () => {
+    setIsLoading(true);
+    try {
+      const res = await api.get('/quizzes-history', {
+        params: { limit: PAGE_SIZE, ...(nextCursor && { cursor: nextCursor }) },
+      });
+      const cursor = res.headers['x-next-cursor'] ?? null;
+      setOlderQuizzes((prev) => [...prev, ...res.data]);
+      setNextCursor(cursor);
+      setHasMore(cursor !== null);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
 
   if (!quizzes || quizzes.length === 0) {
     return (
@@ -20,12 +46,15 @@ function QuizHistory() {
     );
   }
 
-  const sortedQuizzes = [...quizzes]
-    .sort(
-      (a, b) =>
-        new Date(b.created_at).getTime() - new Date(a.created_at).getTime(),
-    )
-    .slice(0, 10);
+  // Les pages chargées recoupent les quiz déjà en mémoire : dédoublonnage par id
+  const byId = new Map<string | undefined, QuizType>();
+  [...olderQuizzes, ...quizzes].forEach((quiz) => byId.set(quiz.id, quiz));
+  const sortedQuizzes = [...byId.values()].sort(
+    (a, b) =>
+      new Date(b.created_at).getTime() - new Date(a.created_at).getTime(),
+  );
+  const canLoadMore =
+    hasMore && (olderQuizzes.length > 0 || quizzes.length >= LOGIN_QUIZZES);
 
   const formatDate = (dateString: string) => {
     const date = new Date(dateString);
@@ -41,7 +70,7 @@ function QuizHistory() {
   return (
     <div className='mt-12 rounded-xl border border-slate-700 bg-slate-800 p-6 shadow-xl sm:p-8'>
       <div className='flex items-center justify-between'>
-        <h2 className='text-2xl font-bold'>Historique des 10 derniers quiz</h2>
+        <h2 className='text-2xl font-bold'>Historique des quiz</h2>
         <button
           onClick={() => setIsExpanded(!isExpanded)}
           className='text-sm font-semibold text-teal-400 hover:text-teal-500 md:hidden'
@@ -100,7 +129,7 @@ function QuizHistory() {
         <div className='space-y-4'>
           <AnimatePresence>
             {sortedQuizzes
-              .slice(0, isExpanded ? 10 : 3)
+              .slice(0, isExpanded ? sortedQuizzes.length : 3)
               .map((quiz) => (
                 <motion.div
                   key={quiz.id}
@@ -126,6 +155,20 @@ function QuizHistory() {
           </AnimatePresence>
         </div>
       </div>
+
+      {canLoadMore && (
+        <div
+          className={`mt-6 text-center ${isExpanded ? '' : 'hidden md:block'}`}
+        >
+          <button
+            onClick={loadMore}
+            disabled={isLoading}
+            className='text-sm font-semibold text-teal-400 hover:text-teal-500 disabled:opacity-50'
+          >
+            {isLoading ? 'Chargement...' : 'Charger plus'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
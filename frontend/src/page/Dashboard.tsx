@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import type { QuizType, QuizElements, QuotaType } from '../types';
 import Quiz from '../component/Quiz';
 import QuizHistory from '../component/QuizHistory';
@@ -48,6 +48,8 @@ function Dashboard() {
   const [earnedPoints, setEarnedPoints] = useState(0);
   const [isSaving, setIsSaving] = useState(false);
   const [saveError, setSaveError] = useState('');
+  const startedAt = useRef(Date.now());
+  const durationSeconds = useRef<number | null>(null);
 
   const dispatch: AppDispatch = useDispatch();
 
@@ -110,6 +112,7 @@ function Dashboard() {
       );
       setTotalPoints(totalPossiblePoints);
       dispatch(setCurrentQuiz(processedQuiz));
+      startedAt.current = Date.now();
       dispatch(decrementQuota());
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Une erreur est survenue');
@@ -138,12 +141,20 @@ function Dashboard() {
     if (currentQuestionIndex < quiz.elements.length - 1) {
       setCurrentQuestionIndex((prevIndex) => prevIndex + 1);
     } else {
+      durationSeconds.current = Math.round(
+        (Date.now() - startedAt.current) / 1000,
+      );
       setQuizCompleted(true);
     }
   };
 
   const saveQuizResult = async () => {
     if (!quiz) return;
+    // Quiz sans point : aucun score valide à enregistrer (max_score >= 1)
+    if (totalPoints <= 0) {
+      dispatch(addQuiz(quiz));
+      return;
+    }
 
     setIsSaving(true);
     setSaveError('');
@@ -151,10 +162,16 @@ function Dashboard() {
     try {
       await api.patch(`/quizzes-resul/${quiz.id}`, {
         result: `${earnedPoints}/${totalPoints}`,
+        score: earnedPoints,
+        max_score: totalPoints,
+        duration_seconds: durationSeconds.current,
       });
       const updatedQuiz: QuizType = {
         ...quiz,
         result: `${earnedPoints}/${totalPoints}`,
+        score: earnedPoints,
+        max_score: totalPoints,
+        duration_seconds: durationSeconds.current,
       };
       dispatch(addQuiz(updatedQuiz));
     } catch (err) {
@@ -176,6 +193,7 @@ function Dashboard() {
     setUserAnswers([]);
     setScore(0);
     setEarnedPoints(0);
+    startedAt.current = Date.now();
   };
 
   const createNewQuiz = async () => {
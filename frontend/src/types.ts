@@ -17,6 +17,9 @@ export interface QuizType {
   id?: string;
   title: string;
   result: string | null;
+  score?: number | null;
+  max_score?: number | null;
+  duration_seconds?: number | null;
   created_at: string;
   elements: QuizElements[];
 }